@@ -0,0 +1,10 @@
+"""
+Offline benchmarks and load tests for the chatbot service.
+
+Nothing in this package talks to Gemini or downloads a Whisper model: the
+fake models in `benchmarks.fake_genai` replace them before the app is imported.
+Run everything from the repository root, e.g.:
+
+    python -m benchmarks.micro
+    python -m benchmarks.load --concurrency 16 --requests 400
+"""
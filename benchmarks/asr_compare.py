@@ -0,0 +1,115 @@
+"""
+Accuracy/speed comparison of the ASR backends in services/asr_backends.py.
+
+Each backend runs in its own subprocess so load time and peak memory are
+measured in isolation. Put a reference transcript next to each recording
+(`meeting.mp3` -> `meeting.txt`) to get a word error rate.
+
+    python -m benchmarks.asr_compare recordings/*.mp3 --backends whisper faster_whisper
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.stats import format_table
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def word_error_rate(reference, hypothesis):
+    ref = re.findall(r"[\w']+", reference.lower())
+    hyp = re.findall(r"[\w']+", hypothesis.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend_name, paths, model_size, compute_type):
+    """
+    Runs inside the worker subprocess; returns one result row per recording.
+    """
+    os.environ.setdefault("GOOGLE_API_KEY", "asr-benchmark")
+    from services.asr_backends import create_asr_backend
+    from services.audio_service import decode_audio, SAMPLE_RATE
+
+    start = time.perf_counter()
+    backend = create_asr_backend(backend_name, model_size=model_size, compute_type=compute_type)
+    load_seconds = time.perf_counter() - start
+
+    rows = []
+    for path in paths:
+        audio = decode_audio(path)
+        start = time.perf_counter()
+        text = backend.transcribe(audio)["text"]
+        elapsed = time.perf_counter() - start
+        duration = len(audio) / SAMPLE_RATE
+        row = {
+            "backend": backend_name,
+            "file": os.path.basename(path),
+            "audio_s": duration,
+            "transcribe_s": elapsed,
+            "rtf": elapsed / duration if duration else 0.0,
+            "load_s": load_seconds,
+        }
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                row["wer_pct"] = word_error_rate(f.read(), text) * 100
+        rows.append(row)
+    for row in rows:
+        row["peak_rss_mb"] = _peak_rss_mb()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ASR backends on real recordings.")
+    parser.add_argument("audio", nargs="+", help="Audio/video files (reference transcript in <name>.txt)")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "faster_whisper"])
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    paths = [os.path.abspath(p) for p in args.audio]
+
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, paths, args.model_size, args.compute_type)))
+        return
+
+    rows = []
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.asr_compare", *paths, "--worker", backend,
+             "--model-size", args.model_size, "--compute-type", args.compute_type],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend}: failed\n{proc.stderr[-2000:]}", file=sys.stderr)
+            continue
+        rows.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(format_table(rows, ["backend", "file", "audio_s", "transcribe_s", "rtf", "wer_pct", "load_s", "peak_rss_mb"]))
+
+
+if __name__ == "__main__":
+    main()
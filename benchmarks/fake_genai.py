@@ -0,0 +1,226 @@
+"""
+Local stand-ins for google.generativeai and Whisper.
+
+`install()` must be called before anything imports `config` or the services,
+so that the app never configures the real client or loads a real model.
+"""
+import os
+import re
+import sys
+import json
+import time
+import types
+import itertools
+import threading
+
+# Tunables for the fake LLM; adjusted with configure_fake()
+FAKE_SETTINGS = {
+    "first_token_latency": 0.5,   # seconds before the first token
+    "tokens_per_second": 50.0,    # generation speed after the first token
+    "response_tokens": 120,       # length of every answer
+    "transcribe_latency": 1.0,    # seconds per fake Whisper transcription
+    "cache_create_latency": 0.3,  # seconds per CachedContent.create
+    "cache_min_chars": 0,         # reject smaller prefixes, like the real minimum token count
+}
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "prompt_chars": 0, "cached_chars": 0, "caches_created": 0, "transcriptions": 0}
+
+
+def configure_fake(**settings):
+    unknown = set(settings) - set(FAKE_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown fake settings: {sorted(unknown)}")
+    FAKE_SETTINGS.update(settings)
+
+
+def fake_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_fake_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _record(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeResponse:
+    """
+    Mimics GenerateContentResponse closely enough for the routes: `.text`
+    for a blocking call, iteration over chunks for stream=True.
+    """
+    def __init__(self, tokens, stream=False):
+        self._tokens = tokens
+        self._stream = stream
+        self._consumed = not stream
+
+    def __iter__(self):
+        interval = 1.0 / FAKE_SETTINGS["tokens_per_second"]
+        for i, token in enumerate(self._tokens):
+            if i:
+                time.sleep(interval)
+            yield FakeChunk(token + " ")
+        self._consumed = True
+
+    def resolve(self):
+        for _ in self:
+            pass
+
+    @property
+    def text(self):
+        if not self._consumed:
+            raise ValueError("Iterate over the streamed response (or call resolve()) before reading .text")
+        return " ".join(self._tokens)
+
+
+class FakeCachedContent:
+    """
+    Stand-in for genai.caching.CachedContent; entries live in-process and expire by TTL.
+    """
+    _entries = {}
+    _ids = itertools.count(1)
+    _lock = threading.Lock()
+
+    def __init__(self, name, model, text, expires_at):
+        self.name = name
+        self.model = model
+        self.text = text
+        self.expires_at = expires_at
+
+    @classmethod
+    def create(cls, model, *, display_name=None, system_instruction=None, contents=None, ttl=None, **kwargs):
+        text = (system_instruction or "") + "".join(str(c) for c in (contents or []))
+        if len(text) < FAKE_SETTINGS["cache_min_chars"]:
+            raise ValueError("Cached content is too small")
+        time.sleep(FAKE_SETTINGS["cache_create_latency"])
+        seconds = ttl.total_seconds() if ttl is not None else 3600
+        with cls._lock:
+            entry = cls(f"cachedContents/fake-{next(cls._ids)}", model, text, time.time() + seconds)
+            cls._entries[entry.name] = entry
+        _record("caches_created")
+        return entry
+
+    @classmethod
+    def get(cls, name):
+        with cls._lock:
+            entry = cls._entries.get(name)
+        if entry is None or entry.expires_at <= time.time():
+            raise KeyError(f"Cached content {name} not found or expired")
+        return entry
+
+
+class FakeCacheClient:
+    """
+    Stand-in for the cache service client that services/prompt_cache.py creates
+    cached content through (it takes a timeout, CachedContent.create does not).
+    """
+    def create_cached_content(self, cached_content=None, timeout=None, **kwargs):
+        if timeout is not None and FAKE_SETTINGS["cache_create_latency"] > timeout:
+            from google.api_core.exceptions import DeadlineExceeded
+            time.sleep(timeout)
+            raise DeadlineExceeded("Deadline exceeded")
+        return FakeCachedContent.create(
+            cached_content.model,
+            display_name=cached_content.display_name,
+            contents=[part.text for content in cached_content.contents for part in content.parts],
+            ttl=cached_content.ttl,
+        )
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name="gemini-pro", **kwargs):
+        self.model_name = model_name
+        self.kwargs = kwargs
+        self.cached_content = None
+
+    @classmethod
+    def from_cached_content(cls, cached_content, **kwargs):
+        name = cached_content if isinstance(cached_content, str) else cached_content.name
+        entry = FakeCachedContent.get(name)
+        model = cls(entry.model, **kwargs)
+        model.cached_content = name
+        return model
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        prompt = contents if isinstance(contents, str) else str(contents)
+        if self.cached_content is not None:
+            # Fails like the real API once the handle has expired
+            _record("cached_chars", len(FakeCachedContent.get(self.cached_content).text))
+        _record("calls")
+        _record("prompt_chars", len(prompt))
+
+        count = FAKE_SETTINGS["response_tokens"]
+        tokens = [f"token{i}" for i in range(count)]
+        if "Respond with ONLY a JSON object" in prompt:
+            # Packed batch prompt: answer every numbered question
+            numbers = re.findall(r"^(\d+)\. ", prompt, re.MULTILINE)
+            per_answer = " ".join(tokens[:max(count // max(len(numbers), 1), 1)])
+            tokens = [json.dumps({n: per_answer for n in numbers})]
+        latency = FAKE_SETTINGS["first_token_latency"]
+        if not stream:
+            latency += max(count - 1, 0) / FAKE_SETTINGS["tokens_per_second"]
+        timeout = (kwargs.get("request_options") or {}).get("timeout")
+        if timeout is not None and latency > timeout:
+            # Like the real client: give up after `timeout` seconds
+            from google.api_core.exceptions import DeadlineExceeded
+            time.sleep(timeout)
+            raise DeadlineExceeded("Deadline exceeded")
+        time.sleep(latency)
+        return FakeResponse(tokens, stream=stream)
+
+
+class FakeWhisperModel:
+    def transcribe(self, audio, **kwargs):
+        _record("transcriptions")
+        time.sleep(FAKE_SETTINGS["transcribe_latency"])
+        return {"text": "This is a fake transcript of the uploaded recording.", "segments": []}
+
+
+class FakeASRBackend:
+    """
+    Stand-in for every services.asr_backends backend, so ASR_BACKEND=faster_whisper
+    is faked as well as whisper.
+    """
+    name = "fake"
+
+    def __init__(self, model_size="base", **kwargs):
+        self.model = FakeWhisperModel()
+
+    def transcribe(self, audio):
+        return self.model.transcribe(audio)
+
+
+def install():
+    """
+    Patch google.generativeai, whisper and the ASR backends in place. Safe to call
+    repeatedly, and works without whisper or faster-whisper installed.
+    """
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark-key")
+
+    import google.generativeai as genai
+    import google.generativeai.caching
+    import google.generativeai.client as genai_client
+    genai.GenerativeModel = FakeGenerativeModel
+    genai.caching.CachedContent = FakeCachedContent
+    genai_client.get_default_cache_client = FakeCacheClient
+    genai.configure = lambda *args, **kwargs: None
+
+    # A stub module, never the real package: importing torch alone takes seconds
+    whisper = types.ModuleType("whisper")
+    whisper.load_model = lambda *args, **kwargs: FakeWhisperModel()
+    sys.modules["whisper"] = whisper
+
+    from services import asr_backends
+    for name in list(asr_backends.ASR_BACKENDS):
+        asr_backends.ASR_BACKENDS[name] = FakeASRBackend
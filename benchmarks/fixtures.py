@@ -0,0 +1,197 @@
+"""
+Generates fixture corpora for the benchmarks.
+
+Files are built on the fly rather than checked in, so their size can be scaled
+with `scale` (roughly pages / paragraphs / rows per 10 units).
+"""
+import os
+import math
+import wave
+import struct
+import random
+import zipfile
+
+SENTENCES = [
+    "The client needs a responsive web dashboard for tracking shipments.",
+    "Milestones are reviewed every two weeks with the project owner.",
+    "The backend exposes a REST API written in Python with Flask.",
+    "Freelancers must provide a portfolio and pass a technical interview.",
+    "The budget for the first phase is capped at twelve thousand dollars.",
+    "Deliverables include source code, documentation and a deployment guide.",
+    "All designs follow the brand guidelines shared in the kickoff call.",
+    "Payments are released once the client approves each milestone.",
+]
+
+
+def _paragraphs(count, seed=0):
+    rnd = random.Random(seed)
+    return [" ".join(rnd.choice(SENTENCES) for _ in range(4)) for _ in range(count)]
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages=10):
+    """
+    Writes a minimal multi-page PDF (Helvetica text only) that PyPDF2 can read.
+    """
+    objects = []
+    page_ids = []
+    font_id = 3
+    next_id = 4
+    for page_no in range(pages):
+        lines = [f"Project specification - page {page_no + 1}"] + _paragraphs(12, seed=page_no)
+        ops = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+        for line in lines:
+            ops.append(f"({_pdf_escape(line[:110])}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects.append((content_id, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"))
+        objects.append((page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")))
+        page_ids.append(page_id)
+
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.insert(0, (1, b"<< /Type /Catalog /Pages 2 0 R >>"))
+    objects.insert(1, (2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1")))
+    objects.insert(2, (font_id, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"))
+    objects.sort()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id, body in objects:
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for obj_id, _ in objects:
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return path
+
+
+def _xml_escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def write_docx(path, paragraphs=100, table_rows=20):
+    """
+    Writes a DOCX with body paragraphs followed by a three-column table.
+    """
+    body = []
+    for para in _paragraphs(paragraphs, seed=1):
+        body.append(f"<w:p><w:r><w:t>{_xml_escape(para)}</w:t></w:r></w:p>")
+    rows = []
+    for i in range(table_rows):
+        cells = [f"Task {i + 1}", SENTENCES[i % len(SENTENCES)], f"{(i + 1) * 3} days"]
+        rows.append("<w:tr>" + "".join(
+            f"<w:tc><w:p><w:r><w:t>{_xml_escape(c)}</w:t></w:r></w:p></w:tc>" for c in cells
+        ) + "</w:tr>")
+    body.append("<w:tbl>" + "".join(rows) + "</w:tbl>")
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(body)}</w:body></w:document>'
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types)
+        zf.writestr("_rels/.rels", rels)
+        zf.writestr("word/document.xml", document)
+    return path
+
+
+def write_xlsx(path, rows=500):
+    import pandas as pd
+    rnd = random.Random(2)
+    df = pd.DataFrame({
+        "freelancer": [f"Freelancer {i}" for i in range(rows)],
+        "skill": [rnd.choice(["React", "Flask", "Figma", "SEO", "Swift"]) for _ in range(rows)],
+        "rate_usd": [rnd.randint(15, 120) for _ in range(rows)],
+        "rating": [round(rnd.uniform(3.0, 5.0), 1) for _ in range(rows)],
+    })
+    df.to_excel(path, index=False)
+    return path
+
+
+def write_html(path, sections=40):
+    parts = ["<html><head><title>Docs</title><style>body{font:14px sans-serif}</style></head><body>"]
+    for i, para in enumerate(_paragraphs(sections, seed=3)):
+        parts.append(f"<h2>Section {i + 1}</h2>\n\n\n<p>{para}</p>\n\n<script>var x={i};</script>")
+    parts.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return path
+
+
+def write_txt(path, paragraphs=100):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(_paragraphs(paragraphs, seed=4)))
+    return path
+
+
+def write_csv(path, rows=500):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("task,owner,estimate_days\n")
+        for i in range(rows):
+            f.write(f"Task {i},Owner {i % 7},{(i % 10) + 1}\n")
+    return path
+
+
+def write_wav(path, seconds=5.0, sample_rate=16000):
+    """
+    Writes a mono 16-bit WAV: a tone burst, a stretch of silence, another burst.
+    """
+    total = int(seconds * sample_rate)
+    frames = bytearray()
+    for n in range(total):
+        t = n / sample_rate
+        voiced = (t % 2.0) < 1.0
+        value = 0.3 * math.sin(2 * math.pi * 220 * t) if voiced else 0.0
+        frames += struct.pack("<h", int(value * 32767))
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(bytes(frames))
+    return path
+
+
+def build_corpus(dest_dir, scale=10):
+    """
+    Builds one fixture per supported format in `dest_dir` and returns a dict
+    mapping file extension to path.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    corpus = {
+        "pdf": write_pdf(os.path.join(dest_dir, "fixture.pdf"), pages=scale),
+        "docx": write_docx(os.path.join(dest_dir, "fixture.docx"), paragraphs=scale * 10, table_rows=scale * 2),
+        "xlsx": write_xlsx(os.path.join(dest_dir, "fixture.xlsx"), rows=scale * 50),
+        "html": write_html(os.path.join(dest_dir, "fixture.html"), sections=scale * 4),
+        "txt": write_txt(os.path.join(dest_dir, "fixture.txt"), paragraphs=scale * 10),
+        "csv": write_csv(os.path.join(dest_dir, "fixture.csv"), rows=scale * 50),
+        "wav": write_wav(os.path.join(dest_dir, "fixture.wav"), seconds=max(scale / 2, 2.0)),
+    }
+    return corpus
@@ -0,0 +1,68 @@
+"""
+Import-time budget check for worker cold start.
+
+Imports `main` in a fresh interpreter with `-X importtime`, fails if the app
+takes longer than the budget or drags in any heavy optional library that
+should only be loaded when its format is first used.
+
+    python -m benchmarks.import_budget --budget-ms 3000
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just to serve a text-only chat
+LAZY_MODULES = ["torch", "whisper", "pandas", "PyPDF2", "docx", "bs4", "pytube", "wikipedia", "numpy"]
+
+PROBE = (
+    "import sys, json, main; "
+    "print('LOADED=' + json.dumps(sorted(m for m in {mods} if m in sys.modules)))"
+)
+
+
+def measure():
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "import-budget-check")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(mods=LAZY_MODULES)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    main_us = 0
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+main$", line)
+        if match:
+            main_us = int(match.group(1))
+    loaded = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("LOADED="):
+            loaded = json.loads(line[len("LOADED="):])
+    return main_us / 1000.0, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's import time and lazy-import guarantees.")
+    parser.add_argument("--budget-ms", type=float, default=3000.0)
+    args = parser.parse_args()
+
+    elapsed_ms, loaded = measure()
+    print(f"import main: {elapsed_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if loaded:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if elapsed_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Regression cases for the intent router's small-talk fast path.
+
+A template answer is only right when the whole message is small talk; anything
+that carries a real question has to reach Gemini. Exits non-zero on a mismatch.
+
+    python -m benchmarks.intent_cases
+"""
+import os
+import sys
+
+# (message, expected intent or None for "needs a real answer")
+CASES = [
+    ("hi", "greeting"),
+    ("Hello!", "greeting"),
+    ("hiiii", "greeting"),
+    ("heyyy there", "greeting"),
+    ("how are you?", "wellbeing"),
+    ("hi, how are you?", "wellbeing"),
+    ("how r u", "wellbeing"),
+    ("thanks", "thanks"),
+    ("thanksss", "thanks"),
+    ("thanks that helps", "thanks"),
+    ("appreciate it", "thanks"),
+    ("bye", "goodbye"),
+    ("see you later", "goodbye"),
+    ("gotta go", "goodbye"),
+    # Real questions that open like small talk
+    ("hey can you review my contract", None),
+    ("how do you handle disputes between founders", None),
+    ("how are you handling security", None),
+    ("are you well versed in react", None),
+    ("hello i need a designer", None),
+    ("appreciate the detailed breakdown of costs", None),
+    ("hi what services do you offer", None),
+    ("thanks now explain the timeline", None),
+    ("how much does it cost", None),
+    ("ok", None),
+]
+
+# (question, expected FAQ entry id or None) for the StackWalls FAQ fast path
+FAQ_CASES = [
+    ("What services does StackWalls offer?", "services"),
+    ("what services do you offer", "services"),
+    ("Tell me about StackWalls", "what_is_stackwalls"),
+    ("How does the AI matching work?", "ai_matching"),
+    ("Does StackWalls offer no-code development?", "no_code"),
+    # Same words, different question: negations and qualifiers
+    ("What services does StackWalls not offer?", None),
+    ("Does StackWalls offer services in Germany?", None),
+    ("How does StackWalls match clients without AI?", None),
+    ("Which services doesn't StackWalls offer?", None),
+    ("What services does StackWalls offer for startups?", None),
+    ("How much does StackWalls charge?", None),
+]
+
+
+def main():
+    os.environ.setdefault("GOOGLE_API_KEY", "intent-cases-check")
+    from services.intent_router import classify_small_talk, match_faq
+    from config import FAQ_MIN_SCORE
+
+    failures = 0
+    for message, expected in CASES:
+        got = classify_small_talk(message)
+        if got != expected:
+            failures += 1
+            print(f"FAIL: {message!r}: expected {expected}, got {got}")
+    for question, expected in FAQ_CASES:
+        entry, score = match_faq(question)
+        got = entry["id"] if entry is not None and score >= FAQ_MIN_SCORE else None
+        if got != expected:
+            failures += 1
+            print(f"FAIL: {question!r}: expected FAQ {expected}, got {got} (score {score:.2f})")
+    total = len(CASES) + len(FAQ_CASES)
+    print(f"{total - failures}/{total} intent cases pass")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Concurrent load driver for every chat endpoint.
+
+By default the app is imported in-process with the fake Gemini/Whisper models
+and driven through Flask's test client. Pass --url to hit a running instance
+instead (which must have been started with the fakes installed, or will bill
+real quota).
+
+    python -m benchmarks.load --concurrency 16 --requests 400 --latency 0.8
+"""
+import argparse
+import glob
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_genai import install, configure_fake, fake_stats
+from benchmarks.fixtures import build_corpus
+from benchmarks.stats import summarize, format_table
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One scenario per blueprint endpoint (and per interactive_chat option)
+SCENARIOS = [
+    {"name": "project_discussion", "path": "/api/project_discussion_route/chat",
+     "form": {"question": "What are the milestones of this project?"}, "files": ["pdf"]},
+    {"name": "stackwalls", "path": "/api/stackwalls_route/chat",
+     "form": {"question": "How does StackWalls vet freelancers?"}, "files": []},
+    {"name": "cofounder", "path": "/api/cofounder_route/chat",
+     "form": {"question": "What should we build first?"}, "files": ["docx"]},
+    {"name": "freelancer", "path": "/api/freelancer_route/chat",
+     "form": {"question": "Which freelancer has the best rating for React?"}, "files": ["xlsx"]},
+    {"name": "interactive_1", "path": "/api/interactive_chat",
+     "form": {"option": "1", "question": "Summarize the technical scope."}, "files": ["html"]},
+    {"name": "interactive_2", "path": "/api/interactive_chat",
+     "form": {"option": "2", "question": "What are Magic Baskets?"}, "files": []},
+    {"name": "interactive_3", "path": "/api/interactive_chat",
+     "form": {"option": "3", "question": "What did the meeting decide?"}, "files": ["wav"]},
+    {"name": "interactive_4", "path": "/api/interactive_chat",
+     "form": {"option": "4", "question": "How should I pick a freelancer?"}, "files": ["csv"]},
+    {"name": "batch", "path": "/api/batch_route/chat",
+     "form": {"option": "4", "questions": [
+         "Does the freelancer have React experience?",
+         "What is their hourly rate?",
+         "What is their rating?",
+         "Are they available for a long-term project?",
+     ]}, "files": ["xlsx"]},
+]
+
+
+def use_scratch_corpus():
+    """
+    Points CORPUS_DIR at a new temporary directory so extracted text cached by
+    an earlier run can't turn this run's first requests into warm hits. Must run
+    before `config` is imported; returns the directory for the caller to remove.
+    """
+    corpus_dir = tempfile.mkdtemp(prefix="bench-corpus-")
+    os.environ["CORPUS_DIR"] = corpus_dir
+    return corpus_dir
+
+
+class InProcessClient:
+    def __init__(self):
+        from main import app
+        self.app = app
+        self.local = threading.local()
+
+    def post(self, path, form, files):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        data = dict(form)
+        handles = []
+        for field, (filename, path_on_disk) in files.items():
+            fh = open(path_on_disk, "rb")
+            handles.append(fh)
+            data[field] = (fh, filename)
+        try:
+            resp = client.post(path, data=data, content_type="multipart/form-data")
+            return resp.status_code
+        finally:
+            for fh in handles:
+                fh.close()
+
+
+class HttpClient:
+    def __init__(self, base_url, timeout):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.local = threading.local()
+        self.requests = requests
+
+    def post(self, path, form, files):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        handles = {field: (filename, open(p, "rb")) for field, (filename, p) in files.items()}
+        try:
+            resp = session.post(self.base_url + path, data=form, files=handles, timeout=self.timeout)
+            return resp.status_code
+        except self.requests.RequestException:
+            return 599
+        finally:
+            for _, fh in handles.values():
+                fh.close()
+
+
+def run(client, corpus, total_requests, concurrency, users=50, scenarios=None):
+    scenarios = scenarios or SCENARIOS
+    counter = itertools.count()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def one_request(_):
+        n = next(counter)
+        scenario = scenarios[n % len(scenarios)]
+        form = dict(scenario["form"], username=f"bench_user_{n % users}")
+        files = {}
+        for i, ext in enumerate(scenario["files"], start=1):
+            files[f"uploaded_file{i}"] = (f"bench.{ext}", corpus[ext])
+        start = time.perf_counter()
+        status = client.post(scenario["path"], form, files)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[scenario["name"]].append(elapsed)
+            if status >= 400:
+                errors[scenario["name"]] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total_requests)))
+    wall = time.perf_counter() - wall_start
+
+    rows = []
+    for scenario in scenarios:
+        samples = latencies.get(scenario["name"], [])
+        row = {"endpoint": scenario["name"], "errors": errors.get(scenario["name"], 0)}
+        row.update(summarize(samples, wall))
+        rows.append(row)
+    everything = [s for samples in latencies.values() for s in samples]
+    total = {"endpoint": "ALL", "errors": sum(errors.values())}
+    total.update(summarize(everything, wall))
+    rows.append(total)
+    return rows, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test over all chat endpoints.")
+    parser.add_argument("--url", help="Base URL of a running instance (default: in-process test client)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=9)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--scale", type=int, default=5, help="Fixture size multiplier")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM first-token latency (s)")
+    parser.add_argument("--tps", type=float, default=50.0, help="Fake LLM tokens per second")
+    parser.add_argument("--transcribe-latency", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="HTTP timeout in --url mode")
+    args = parser.parse_args()
+
+    corpus_dir = None if args.url else use_scratch_corpus()
+    install()
+    configure_fake(
+        first_token_latency=args.latency,
+        tokens_per_second=args.tps,
+        transcribe_latency=args.transcribe_latency,
+    )
+    os.chdir(REPO_ROOT)  # the routes resolve uploads/ and stackwalls.txt relative to cwd
+    client = HttpClient(args.url, args.timeout) if args.url else InProcessClient()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(tmp, scale=args.scale)
+        rows, wall = run(client, corpus, args.requests, args.concurrency, users=args.users)
+    if not args.url:
+        # The routes save uploads next to the real ones; don't leave fixtures behind
+        for leftover in glob.glob(os.path.join(REPO_ROOT, "uploads", "bench*")):
+            os.remove(leftover)
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    print(format_table(rows, ["endpoint", "count", "errors", "p50_ms", "p95_ms", "p99_ms", "rps"]))
+    print(f"\n{args.requests} requests in {wall:.1f}s at concurrency {args.concurrency}")
+    if not args.url:
+        stats = fake_stats()
+        print(f"LLM calls: {stats['calls']}, prompt chars: {stats['prompt_chars']}, "
+              f"served from context cache: {stats['cached_chars']} chars, "
+              f"transcriptions: {stats['transcriptions']}")
+
+
+if __name__ == "__main__":
+    main()
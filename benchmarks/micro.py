@@ -0,0 +1,56 @@
+"""
+Micro-benchmarks for the file extractors in services/pdf_service.py.
+
+    python -m benchmarks.micro --iterations 20 --scale 10
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.fake_genai import install
+from benchmarks.fixtures import build_corpus
+from benchmarks.stats import summarize, format_table
+
+
+def run(iterations=20, scale=10):
+    install()
+    from services import pdf_service
+
+    cases = [
+        ("process_pdf_file", pdf_service.process_pdf_file, "pdf"),
+        ("process_doc_file", pdf_service.process_doc_file, "docx"),
+        ("process_txt_file", pdf_service.process_txt_file, "txt"),
+        ("process_csv_file", pdf_service.process_csv_file, "csv"),
+        ("process_xls_xlsx_file", pdf_service.process_xls_xlsx_file, "xlsx"),
+        ("process_html_file", pdf_service.process_html_file, "html"),
+    ]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(tmp, scale=scale)
+        for name, func, ext in cases:
+            path = corpus[ext]
+            output_chars = len(func(path))  # warm-up, also keeps imports out of the timings
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                func(path)
+                samples.append(time.perf_counter() - start)
+            row = {"function": name, "chars": output_chars}
+            row.update(summarize(samples))
+            rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pdf_service extractors on generated fixtures.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=10, help="Fixture size multiplier")
+    args = parser.parse_args()
+
+    rows = run(iterations=args.iterations, scale=args.scale)
+    print(format_table(rows, ["function", "chars", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"]))
+
+
+if __name__ == "__main__":
+    main()
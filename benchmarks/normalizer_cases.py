@@ -0,0 +1,67 @@
+"""
+Regression cases for reference text normalization (services/text_normalizer.py).
+
+Normalization may only drop text that carries no information: page numbers,
+running headers/footers and verbatim repeats. Exits non-zero on a mismatch.
+
+    python -m benchmarks.normalizer_cases
+"""
+import os
+import sys
+
+PAGE_BREAK = "\f"
+
+MILESTONES = "\n\n".join(
+    f"Milestone {n}: delivery of the agreed scope for this phase, payable on acceptance. "
+    f"Amount due: ${amount} on {date}."
+    for n, amount, date in ((1, "4,000", "2024-03-01"), (2, "6,500", "2024-05-15"), (3, "9,000", "2024-08-30"))
+)
+
+REPEATED = (
+    "This agreement is governed by the laws of the State of Delaware and both parties consent to its courts.\n\n"
+    "This  agreement is governed by the laws of the State of Delaware and both parties consent to its courts."
+)
+
+PAGED = PAGE_BREAK.join(
+    f"ACME Services Agreement\nSection about {topic} and its terms.\nDesign\n{cost}\n{n}"
+    for n, (topic, cost) in enumerate((("scope", 120), ("payment", 80), ("support", 45), ("termination", 300)), start=1)
+)
+
+
+def check(name, ok, detail):
+    if not ok:
+        print(f"FAIL: {name}: {detail}")
+    return ok
+
+
+def main():
+    os.environ.setdefault("GOOGLE_API_KEY", "normalizer-cases-check")
+    from services.text_normalizer import normalize_text
+
+    results = []
+
+    text, report = normalize_text(MILESTONES)
+    results.append(check(
+        "paragraphs differing only in amounts and dates survive",
+        all(f"Milestone {n}:" in text for n in (1, 2, 3)) and report["duplicate_paragraphs"] == 0,
+        report,
+    ))
+
+    text, report = normalize_text(REPEATED)
+    results.append(check("verbatim repeats are dropped", report["duplicate_paragraphs"] == 1, report))
+
+    text, report = normalize_text(PAGED)
+    lines = text.splitlines()
+    results.append(check(
+        "page numbers and running headers go, table cells stay",
+        "ACME Services Agreement" not in text and all(c in lines for c in ("120", "80", "45", "300"))
+        and not any(n in lines for n in ("1", "2", "3", "4")),
+        text,
+    ))
+
+    print(f"{sum(results)}/{len(results)} normalizer cases pass")
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Regression cases for Gemini context caching (services/prompt_cache.py), run
+against the local fakes. Exits non-zero on a mismatch.
+
+    python -m benchmarks.prompt_cache_cases
+"""
+import os
+import sys
+
+PREFIX = "StackWalls reference content. " * 400
+SMALL_PREFIX = "StackWalls reference content. " * 10
+
+
+def check(name, ok, detail):
+    if not ok:
+        print(f"FAIL: {name}: {detail}")
+    return ok
+
+
+def main():
+    # Small enough that PREFIX is cacheable
+    os.environ["PROMPT_CACHE_MIN_TOKENS"] = "100"
+    from benchmarks.fake_genai import install, configure_fake, fake_stats, FakeCachedContent, FakeGenerativeModel
+    install()
+    configure_fake(first_token_latency=0.0, tokens_per_second=1e6, cache_create_latency=0.0)
+    from services import prompt_cache
+
+    lookups = []
+    from_cached_content = FakeGenerativeModel.from_cached_content.__func__
+
+    def counting_from_cached_content(cls, cached_content, **kwargs):
+        lookups.append(cached_content)
+        return from_cached_content(cls, cached_content, **kwargs)
+    FakeGenerativeModel.from_cached_content = classmethod(counting_from_cached_content)
+
+    import google.generativeai as genai
+    models = []
+
+    class RecordingModel(FakeGenerativeModel):
+        def __init__(self, model_name="gemini-pro", **kwargs):
+            models.append(model_name)
+            super().__init__(model_name, **kwargs)
+    genai.GenerativeModel = RecordingModel
+
+    results = []
+    prompt_cache.generate_with_prefix("small", SMALL_PREFIX, "question")
+    results.append(check(
+        "a prefix below PROMPT_CACHE_MIN_TOKENS goes inline to the caller's model",
+        models == ["gemini-pro"] and fake_stats()["caches_created"] == 0,
+        {"models": models, **fake_stats()},
+    ))
+
+    for _ in range(3):
+        prompt_cache.generate_with_prefix("case", PREFIX, "question")
+    stats = fake_stats()
+    results.append(check(
+        "the cached handle is looked up once, not per request",
+        stats["caches_created"] == 1 and stats["cached_chars"] == 3 * len(PREFIX) and len(lookups) == 1,
+        {"lookups": len(lookups), **stats},
+    ))
+
+    # Evicted server-side before the local TTL runs out
+    FakeCachedContent._entries.clear()
+    try:
+        response = prompt_cache.generate_with_prefix("case", PREFIX, "question")
+        answered = bool(response.text)
+    except Exception as e:
+        answered = f"raised {e!r}"
+    results.append(check("an evicted cache falls back inline", answered is True, answered))
+    results.append(check(
+        "the inline fallback of a cacheable prefix uses PROMPT_CACHE_MODEL",
+        models[-1] == prompt_cache.PROMPT_CACHE_MODEL,
+        models,
+    ))
+    results.append(check(
+        "an evicted cache is dropped from the registry",
+        "case" not in prompt_cache.prefix_registry,
+        prompt_cache.prefix_registry.get("case"),
+    ))
+    prompt_cache.generate_with_prefix("case", PREFIX, "question")
+    results.append(check("the next request caches again", fake_stats()["caches_created"] == 2, fake_stats()))
+
+    print(f"{sum(results)}/{len(results)} prompt cache cases pass")
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
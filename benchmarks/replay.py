@@ -0,0 +1,281 @@
+"""
+Replays captured production traffic (see utils/traffic_capture.py) against the app.
+
+Each captured line is turned back into a request of the same shape: same route,
+option/mode, user, question lengths (repeated questions stay repeated), upload
+types and sizes, and reference links whose stubbed fetch returns as much text as
+the original did. Gemini and Whisper are the local fakes, so nothing is billed.
+Arrival times are kept, compressed by --speedup.
+
+    python -m benchmarks.replay reports/traffic.jsonl --speedup 10 --latency 0.8
+
+By default the app runs in-process. --url hits a running instance instead, which must
+have been started with the fakes installed; its website/Wikipedia fetches are not stubbed.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fixtures
+from benchmarks.fake_genai import install, configure_fake, fake_stats
+from benchmarks.load import InProcessClient, HttpClient, REPO_ROOT, use_scratch_corpus
+from benchmarks.stats import summarize, percentile, format_table
+
+# Extracted size assumed for a link whose original fetch was not recorded (it failed or was skipped)
+DEFAULT_REFERENCE_CHARS = 5000
+# Fixtures are rebuilt per size bucket; larger uploads are capped at this multiple of the base fixture
+MAX_FIXTURE_SCALE = 200
+
+AUDIO_VIDEO = {'mp3', 'mp4', 'wav', 'avi', 'mkv', 'flv', 'mov'}
+TAR_MODES = {'tar': 'w', 'tgz': 'w:gz', 'gz': 'w:gz', 'bz2': 'w:bz2', 'xz': 'w:xz'}
+REPLAY_HOST = "replay.invalid"
+
+
+def load_records(path):
+    """
+    Captured records in arrival order; lines that are not valid JSON (e.g. a
+    line cut short when the server was killed) are skipped.
+    """
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def question_text(digest, chars, fast=False):
+    """
+    A stand-in question: small talk if the original was answered by the intent
+    router, otherwise words seeded by the original's hash and padded to its length.
+    """
+    if fast:
+        return "hello"
+    rnd = random.Random(digest)
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rnd.choice(fixtures.SENTENCES).split()[rnd.randrange(5)].lower())
+    return (" ".join(words)[:max(chars - 1, 1)] + "?") if chars else ""
+
+
+def _write_fixture(path, ext, scale):
+    if ext == 'pdf':
+        return fixtures.write_pdf(path, pages=scale)
+    if ext in ('docx',):
+        return fixtures.write_docx(path, paragraphs=scale * 10, table_rows=scale * 2)
+    if ext in ('xlsx', 'xls'):
+        return fixtures.write_xlsx(path, rows=scale * 50)
+    if ext == 'html':
+        return fixtures.write_html(path, sections=scale * 4)
+    if ext == 'csv':
+        return fixtures.write_csv(path, rows=scale * 50)
+    if ext in AUDIO_VIDEO:
+        # ffmpeg goes by the content, so WAV data under any audio/video name decodes
+        return fixtures.write_wav(path, seconds=scale)
+    if ext == 'zip' or ext in TAR_MODES:
+        member = fixtures.write_txt(path + ".txt", paragraphs=scale * 10)
+        if ext == 'zip':
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.write(member, "notes.txt")
+        else:
+            with tarfile.open(path, TAR_MODES[ext]) as tf:
+                tf.add(member, "notes.txt")
+        os.remove(member)
+        return path
+    return fixtures.write_txt(path, paragraphs=scale * 10)
+
+
+class UploadFixtures:
+    """
+    Fixture files matching captured uploads: the right extension and roughly the
+    recorded size, built once per (extension, size bucket).
+    """
+    def __init__(self, dest_dir):
+        self.dest_dir = dest_dir
+        self.unit_bytes = {}
+        self.paths = {}
+        self.lock = threading.Lock()
+
+    def get(self, ext, size):
+        with self.lock:
+            if ext not in self.unit_bytes:
+                unit = _write_fixture(os.path.join(self.dest_dir, f"unit.{ext}"), ext, 1)
+                self.unit_bytes[ext] = max(os.path.getsize(unit), 1)
+            scale = min(max(round(size / self.unit_bytes[ext]), 1), MAX_FIXTURE_SCALE)
+            key = (ext, scale)
+            if key not in self.paths:
+                self.paths[key] = _write_fixture(os.path.join(self.dest_dir, f"fixture_{scale}.{ext}"), ext, scale)
+            return self.paths[key]
+
+
+def install_reference_stubs():
+    """
+    Replaces website and Wikipedia fetches with text of the size encoded in the
+    replayed link (https://replay.invalid/<chars> or replay-<chars>).
+    """
+    import services.chat_pipeline as chat_pipeline
+
+    def sized_text(value):
+        chars = int(value.rsplit("/", 1)[-1].rsplit("-", 1)[-1])
+        text = " ".join(fixtures.SENTENCES)
+        return (text * (chars // len(text) + 1))[:chars]
+
+    chat_pipeline.get_website_content = sized_text
+    chat_pipeline.get_wikipedia_content = sized_text
+
+
+def build_request(record, uploads):
+    """
+    (path, form, files) reproducing a captured record.
+    """
+    form = {"username": f"replay_{record['user']}"}
+    for field in ('option', 'mode'):
+        if field in record:
+            form[field] = record[field]
+
+    questions = [question_text(d, n, record.get("fast", False)) for d, n in record["questions"]]
+    if record["route"].startswith("/api/batch_route"):
+        form["questions"] = json.dumps(questions)
+    elif questions:
+        form["question"] = questions[0]
+
+    for kind, field in (("website", "website_link1"), ("wikipedia", "wikipedia_title1")):
+        if record["links"].get(kind):
+            sizes = [chars for k, chars in record["refs"] if k == kind] or [DEFAULT_REFERENCE_CHARS]
+            form[field] = f"https://{REPLAY_HOST}/{sizes[0]}" if kind == "website" else f"replay-{sizes[0]}"
+
+    files = {}
+    for i, (ext, size) in enumerate(record["uploads"], start=1):
+        files[f"uploaded_file{i}"] = (f"replay.{ext}", uploads.get(ext, size))
+    return record["route"], form, files
+
+
+def replay(client, records, uploads, speedup, max_in_flight):
+    """
+    Sends every record at its (compressed) arrival time. Returns result rows per
+    route/option, the wall time and how many requests had to queue behind max_in_flight.
+    """
+    latencies = defaultdict(list)
+    recorded = defaultdict(list)
+    errors = defaultdict(int)
+    status_changed = defaultdict(int)
+    lock = threading.Lock()
+
+    in_flight = [0]
+
+    def one_request(record):
+        name = record["route"] + (f"#{record['option']}" if "option" in record else "")
+        path, form, files = build_request(record, uploads)
+        start = time.perf_counter()
+        try:
+            status = client.post(path, form, files)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[name].append(elapsed)
+            recorded[name].append(record["ms"] / 1000)
+            if status >= 400:
+                errors[name] += 1
+            if status != record["status"]:
+                status_changed[name] += 1
+
+    queued = 0
+    first = records[0]["ts"]
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        futures = []
+        for record in records:
+            delay = (record["ts"] - first) / speedup - (time.perf_counter() - wall_start)
+            if delay > 0:
+                time.sleep(delay)
+            with lock:
+                if in_flight[0] >= max_in_flight:
+                    queued += 1
+                in_flight[0] += 1
+            futures.append(pool.submit(one_request, record))
+        # Surface exceptions from the client, not just statuses
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - wall_start
+
+    rows = []
+    for name in sorted(latencies):
+        row = {"route": name, "errors": errors[name], "status_changed": status_changed[name],
+               "recorded_p50_ms": percentile(recorded[name], 50) * 1000}
+        row.update(summarize(latencies[name], wall))
+        rows.append(row)
+    everything = [s for samples in latencies.values() for s in samples]
+    total = {"route": "ALL", "errors": sum(errors.values()), "status_changed": sum(status_changed.values()),
+             "recorded_p50_ms": percentile([s for v in recorded.values() for s in v], 50) * 1000}
+    total.update(summarize(everything, wall))
+    rows.append(total)
+    return rows, wall, queued
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured chat traffic with the LLM and fetches stubbed.")
+    parser.add_argument("capture", help="JSONL file written by utils/traffic_capture.py")
+    parser.add_argument("--url", help="Base URL of a running instance (default: in-process test client)")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Compress inter-arrival times by this factor")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Client-side concurrency cap")
+    parser.add_argument("--limit", type=int, help="Replay only the first N records")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM first-token latency (s)")
+    parser.add_argument("--tps", type=float, default=50.0, help="Fake LLM tokens per second")
+    parser.add_argument("--transcribe-latency", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="HTTP timeout in --url mode")
+    args = parser.parse_args()
+
+    records = load_records(args.capture)[:args.limit]
+    if not records:
+        parser.error(f"No records in {args.capture}.")
+
+    corpus_dir = None if args.url else use_scratch_corpus()
+    install()
+    configure_fake(
+        first_token_latency=args.latency,
+        tokens_per_second=args.tps,
+        transcribe_latency=args.transcribe_latency,
+    )
+    os.chdir(REPO_ROOT)  # the routes resolve uploads/ and stackwalls.txt relative to cwd
+    if args.url:
+        client = HttpClient(args.url, args.timeout)
+    else:
+        client = InProcessClient()
+        install_reference_stubs()
+
+    span = records[-1]["ts"] - records[0]["ts"]
+    print(f"Replaying {len(records)} requests spanning {span:.0f}s at {args.speedup:g}x")
+    with tempfile.TemporaryDirectory() as tmp:
+        rows, wall, queued = replay(client, records, UploadFixtures(tmp), args.speedup, args.max_in_flight)
+    if not args.url:
+        for leftover in glob.glob(os.path.join(REPO_ROOT, "uploads", "replay*")):
+            os.remove(leftover)
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    print(format_table(rows, ["route", "count", "errors", "status_changed", "recorded_p50_ms",
+                              "p50_ms", "p95_ms", "p99_ms", "rps"]))
+    print(f"\n{len(records)} requests in {wall:.1f}s, {queued} queued behind --max-in-flight")
+    if not args.url:
+        stats = fake_stats()
+        print(f"LLM calls: {stats['calls']}, prompt chars: {stats['prompt_chars']}, "
+              f"served from context cache: {stats['cached_chars']} chars, "
+              f"transcriptions: {stats['transcriptions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Regression cases for the voice-activity trimming in front of ASR
+(services/audio_service.py), on synthetic 16 kHz clips: noise with bursts of
+"speech" (a tone with a syllable-rate envelope). Exits non-zero on a mismatch.
+
+    python -m benchmarks.vad_cases
+"""
+import os
+import sys
+import numpy as np
+
+SAMPLE_RATE = 16000
+NOISE_LEVEL = 0.003
+SPEECH_LEVEL = 0.3
+
+
+def synthetic_clip(seconds, speech_spans, seed=0):
+    """
+    Background noise for `seconds`, with speech over each (start_s, end_s) span.
+    """
+    rnd = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = rnd.normal(0.0, NOISE_LEVEL, len(t))
+    # ~4 syllables per second, dipping to silence between them like real speech
+    envelope = np.sin(2 * np.pi * 2 * t) ** 2
+    speech = SPEECH_LEVEL * envelope * np.sin(2 * np.pi * 220 * t)
+    for start, end in speech_spans:
+        span = slice(int(start * SAMPLE_RATE), int(end * SAMPLE_RATE))
+        audio[span] += speech[span]
+    return audio.astype(np.float32)
+
+
+# (name, clip length s, speech spans, expected kept share (min, max))
+CASES = [
+    ("5% speech", 120, [(30, 36)], (0.04, 0.10)),
+    ("8% speech in two bursts", 100, [(10, 14), (70, 74)], (0.07, 0.15)),
+    ("speech throughout", 30, [(0, 30)], (0.90, 1.0)),
+    ("silence only", 30, [], (0.0, 0.0)),
+]
+
+
+def main():
+    os.environ.setdefault("GOOGLE_API_KEY", "vad-cases-check")
+    from services.audio_service import trim_to_speech
+
+    failures = 0
+    for name, seconds, spans, (low, high) in CASES:
+        audio = synthetic_clip(seconds, spans)
+        trimmed, _ = trim_to_speech(audio, SAMPLE_RATE)
+        kept = len(trimmed) / len(audio)
+        if not low <= kept <= high:
+            failures += 1
+            print(f"FAIL: {name}: kept {kept:.0%} of the clip, expected {low:.0%}-{high:.0%}")
+    print(f"{len(CASES) - failures}/{len(CASES)} VAD cases pass")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,15 @@ if not GOOGLE_API_KEY:
     logging.error("Google API Key is missing! Make sure it's set in the .env file or environment.")
     raise RuntimeError("Missing GOOGLE_API_KEY")
 
+# "sync" runs gunicorn gthread workers; "async" runs gevent workers (see gunicorn.conf.py)
+SERVER_MODE = os.getenv("SERVER_MODE", "sync").lower()
+
+# gRPC does not cooperate with gevent, so async mode talks to Gemini over REST
+GENAI_TRANSPORT = "rest" if SERVER_MODE == "async" else None
+
 try:
     # Configure Google Generative AI
-    genai.configure(api_key=GOOGLE_API_KEY)
+    genai.configure(api_key=GOOGLE_API_KEY, transport=GENAI_TRANSPORT)
     logging.info("Google Gemini API successfully configured.")
 except Exception as e:
     logging.error(f"Failed to configure Google Gemini API: {e}")
@@ -29,3 +35,113 @@ except Exception as e:
 CONVERSATION_HISTORY_LIMIT = 5
 SUMMARY_WORD_LIMIT = 500
 MAX_TRANSCRIPT_LENGTH = 10000
+
+# Native threads used to run CPU-heavy extraction/transcription in async mode
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "4"))
+
+# Gemini context caching for byte-identical prompt prefixes (stackwalls.txt + role/instructions)
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Model for every prompt whose prefix is big enough to cache, whether the cache is used or
+# the prefix is sent inline; smaller prefixes keep the caller's model. stackwalls.txt
+# (~2.5k tokens) is far below PROMPT_CACHE_MIN_TOKENS, so caching is inert at its current size.
+PROMPT_CACHE_MODEL = os.getenv("PROMPT_CACHE_MODEL", "models/gemini-1.5-flash-001")  # caching needs a versioned model
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "32768"))  # the model's minimum cacheable size
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+PROMPT_CACHE_RETRY_SECONDS = int(os.getenv("PROMPT_CACHE_RETRY_SECONDS", "600"))  # back-off after a failed create
+
+# Reference text normalization before prompt building (services/text_normalizer.py)
+NORMALIZE_REFERENCES = os.getenv("NORMALIZE_REFERENCES", "true").lower() in ("1", "true", "yes")
+BOILERPLATE_MIN_PAGES = 3           # only look for repeated headers/footers in documents this long
+DEDUPE_MIN_PARAGRAPH_CHARS = 80     # shorter paragraphs (table rows, list items) may repeat legitimately
+
+# Voice-activity trimming before Whisper (services/audio_service.py)
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+VAD_FRAME_MS = 30
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "15"))  # dB above the recording's noise floor
+VAD_MIN_SPEECH_MS = 250     # drop clicks and short bursts
+VAD_MIN_SILENCE_MS = 600    # shorter pauses stay inside a speech region
+VAD_PAD_MS = 200            # context kept on each side of a region
+
+# Speech-to-text backend behind transcribe_audio: "whisper" (openai-whisper, PyTorch fp32)
+# or "faster_whisper" (CTranslate2, quantized; see services/asr_backends.py)
+ASR_BACKEND = os.getenv("ASR_BACKEND", "whisper")
+ASR_MODEL_SIZE = os.getenv("ASR_MODEL_SIZE", "base")
+ASR_COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", "int8")  # faster_whisper only
+ASR_CPU_THREADS = int(os.getenv("ASR_CPU_THREADS", "0"))  # faster_whisper only; 0 = library default
+
+# Local intent router in front of the chat endpoints (services/intent_router.py)
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() in ("1", "true", "yes")
+INTENT_MIN_CONFIDENCE = 0.9   # classifier confidence needed to answer small talk from a template
+INTENT_MAX_WORDS = 8          # longer messages always go to the LLM
+FAQ_PATH = os.getenv("FAQ_PATH", "stackwalls_faq.json")
+FAQ_MIN_SCORE = float(os.getenv("FAQ_MIN_SCORE", "0.75"))  # TF-IDF cosine similarity to a stored question
+# Content words of a question that the matched FAQ entry's questions never use ("in Germany",
+# "for startups"); any more and the question is asking something narrower, so Gemini answers it
+FAQ_MAX_UNMATCHED_TERMS = int(os.getenv("FAQ_MAX_UNMATCHED_TERMS", "0"))
+
+# Multi-question batch endpoint (routes/batch_routes.py)
+BATCH_MAX_QUESTIONS = 20
+BATCH_MAX_PARALLEL = 8   # concurrent Gemini calls for "parallel" mode and packed-reply fallbacks
+
+# Zip/tar reference uploads (services/archive_service.py); limits guard against zip bombs
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "200"))
+ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("ARCHIVE_MAX_MEMBER_BYTES", str(25 * 1024 * 1024)))
+ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv("ARCHIVE_MAX_TOTAL_BYTES", str(200 * 1024 * 1024)))
+ARCHIVE_MAX_RATIO = 100   # uncompressed / compressed size per zip member
+ARCHIVE_WORKERS = int(os.getenv("ARCHIVE_WORKERS", str(os.cpu_count() or 2)))
+
+# Per-request deadline (utils/deadline.py); clients may ask for less/more via X-Request-Timeout
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "120"))
+MAX_REQUEST_TIMEOUT_SECONDS = float(os.getenv("MAX_REQUEST_TIMEOUT_SECONDS", "600"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))   # outbound requests/pytube calls
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "90"))     # a single Gemini call
+ASR_CHUNK_SECONDS = 120   # speech is transcribed in pieces this long so a cancelled request stops early
+
+# Admission control (utils/scheduler.py), per gunicorn worker process. "heavy" requests
+# carry audio/video/archive uploads or large bodies; everything else is "light".
+_sync = SERVER_MODE != "async"
+HEAVY_MAX_CONCURRENT = int(os.getenv("HEAVY_MAX_CONCURRENT", "1" if _sync else str(CPU_EXECUTOR_WORKERS)))
+HEAVY_MAX_QUEUE = int(os.getenv("HEAVY_MAX_QUEUE", "1" if _sync else "50"))
+LIGHT_MAX_CONCURRENT = int(os.getenv("LIGHT_MAX_CONCURRENT", "64"))
+LIGHT_MAX_QUEUE = int(os.getenv("LIGHT_MAX_QUEUE", "128"))
+HEAVY_UPLOAD_BYTES = 5 * 1024 * 1024    # any upload body above this counts as heavy
+USER_MAX_CONCURRENT = int(os.getenv("USER_MAX_CONCURRENT", "2"))  # in-flight requests per user
+# Reverse proxies in front of the app that append to X-Forwarded-For (0: clients connect
+# directly). Anonymous users are capped per client address, read through this many hops.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = 10    # longest a request waits for a slot before a 503
+
+# Shared on-disk corpus of extracted reference text (services/corpus_store.py), mmapped by every worker
+CORPUS_DIR = os.getenv("CORPUS_DIR", "corpus")
+CORPUS_MAX_BYTES = int(os.getenv("CORPUS_MAX_BYTES", str(1024 * 1024 * 1024)))  # start a fresh generation past this
+
+# Startup (services/warmup.py)
+STACKWALLS_PATH = os.getenv("STACKWALLS_PATH", "stackwalls.txt")
+WARMUP_ASR = os.getenv("WARMUP_ASR", "false").lower() in ("1", "true", "yes")  # load the ASR model in each worker at boot
+
+# Website references (services/crawler.py): same-site crawl from the given URL
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "20"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "2"))       # link hops from the start page
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))   # parallel fetches per crawl
+CRAWL_TIME_BUDGET_SECONDS = float(os.getenv("CRAWL_TIME_BUDGET_SECONDS", "10"))  # answer with what arrived by then
+CRAWL_MAX_PAGE_BYTES = 2 * 1024 * 1024
+CRAWL_TTL_SECONDS = int(os.getenv("CRAWL_TTL_SECONDS", "3600"))  # re-fetch pages older than this
+CRAWL_USER_AGENT = os.getenv("CRAWL_USER_AGENT", "StackWallsBot/1.0")
+
+# Opt-in capture of anonymized chat request shapes (utils/traffic_capture.py), replayed
+# offline with benchmarks/replay.py. TRAFFIC_CAPTURE_SALT must be set to a secret (the
+# same on every worker) or capture stays off: unsalted hashes can be matched against guessed questions.
+TRAFFIC_CAPTURE_ENABLED = os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() in ("1", "true", "yes")
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH", "reports/traffic.jsonl")
+TRAFFIC_CAPTURE_SAMPLE_RATE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1.0"))  # fraction of chat requests recorded
+TRAFFIC_CAPTURE_MAX_BYTES = int(os.getenv("TRAFFIC_CAPTURE_MAX_BYTES", str(100 * 1024 * 1024)))  # stop appending past this
+TRAFFIC_CAPTURE_SALT = os.getenv("TRAFFIC_CAPTURE_SALT", "")  # no default on purpose
+
+# Admin endpoints (routes/admin_routes.py) are disabled until ADMIN_TOKEN is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Sampling profiler (utils/profiler.py) and the slow-request log
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))   # time between stack samples
+PROFILE_MAX_SECONDS = 60                                              # longest on-demand profile
+PROFILE_DIR = os.getenv("PROFILE_DIR", "reports/profiles")           # per-request profiles of logged requests
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "30"))  # log requests slower than this; 0 = off
@@ -0,0 +1,37 @@
+# Gunicorn settings, selected by SERVER_MODE:
+#   sync  - gthread workers; each in-flight chat holds an OS thread (workers x threads)
+#   async - gevent workers; outbound Gemini/Wikipedia/website calls yield to other
+#           requests, so one worker can hold hundreds of slow LLM conversations
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "3"))
+
+server_mode = os.getenv("SERVER_MODE", "sync").lower()
+
+if server_mode == "async":
+    # Patch before the app is preloaded below, so the locks and sockets it
+    # creates in the master are already gevent-aware in the workers
+    from gevent import monkey
+    monkey.patch_all()
+
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("ASYNC_WORKER_CONNECTIONS", "500"))
+else:
+    worker_class = "gthread"
+    threads = int(os.getenv("WEB_THREADS", "3"))
+
+# Import main:app (and run its warmup) once in the master; workers share it copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so garbage
+    # collections in the workers don't write to (and un-share) those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from services.warmup import start_worker_warmup
+    start_worker_warmup()
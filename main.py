@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_cors import CORS
-import os
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import TRUSTED_PROXY_COUNT
 
 # Import routes
 from routes.project_discussion_routes import project_discussion_route
@@ -8,23 +9,47 @@ from routes.stackwalls_routes import stackwalls_route
 from routes.cofounder_routes import cofounder_route
 from routes.freelancer_routes import freelancer_route
 from routes.youtube_routes import youtube_bp  # Interactive chat blueprint
+from routes.batch_routes import batch_route
+from routes.health_routes import health_route
+from routes.admin_routes import admin_route
+from services.warmup import warmup, start_worker_warmup
+from utils.traffic_capture import init_capture
+from utils.profiler import init_profiling
 
-app = Flask(__name__)
-CORS(app)
 
-# Ensure necessary directories exist for file uploads, PDF processing, etc.
-os.makedirs('uploads', exist_ok=True)
-os.makedirs('reports', exist_ok=True)
+def create_app():
+    """
+    Builds the app and warms up shared read-only assets (directories, stackwalls.txt,
+    intent router, FAQ index). Under gunicorn with preload_app this runs once in the
+    master before workers fork; see gunicorn.conf.py.
+    """
+    app = Flask(__name__)
+    CORS(app)
+    if TRUSTED_PROXY_COUNT:
+        # request.remote_addr becomes the address the outermost trusted proxy saw;
+        # X-Forwarded-For entries added by the client itself are ignored
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT)
 
-# Register the Blueprints for each "option" route
-app.register_blueprint(project_discussion_route)
-app.register_blueprint(stackwalls_route)
-app.register_blueprint(cofounder_route)
-app.register_blueprint(freelancer_route)
-app.register_blueprint(youtube_bp)  # Register the interactive_chat blueprint
+    warmup()
+    init_capture(app)  # opt-in, see TRAFFIC_CAPTURE_ENABLED
+    init_profiling(app)  # slow-request log and per-request profiles
 
+    # Register the Blueprints for each "option" route
+    app.register_blueprint(project_discussion_route)
+    app.register_blueprint(stackwalls_route)
+    app.register_blueprint(cofounder_route)
+    app.register_blueprint(freelancer_route)
+    app.register_blueprint(youtube_bp)  # Register the interactive_chat blueprint
+    app.register_blueprint(batch_route)  # Multi-question batch chat
+    app.register_blueprint(health_route)  # /healthz and /readyz
+    app.register_blueprint(admin_route)  # /api/admin/profile, needs ADMIN_TOKEN
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
+    start_worker_warmup()
     # Run the Flask app on 0.0.0.0:5000. In production, set debug=False
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,40 @@
+from flask import Blueprint, request, jsonify, Response
+from utils.error_handling import handle_errors
+from utils.admin_auth import admin_required
+from utils.profiler import profile_worker
+from config import PROFILE_INTERVAL_MS, PROFILE_MAX_SECONDS
+
+admin_route = Blueprint('admin_route', __name__, url_prefix='/api/admin')
+
+@admin_route.route('/profile', methods=['GET'])
+@handle_errors
+@admin_required
+def profile():
+    """
+    Samples the worker that serves this request for `seconds` (default 10, at most
+    PROFILE_MAX_SECONDS) and returns the stacks seen.
+    - `format`: "collapsed" (default, flame graph input) or "speedscope" (JSON)
+    - `interval_ms`: time between samples (default PROFILE_INTERVAL_MS)
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', PROFILE_INTERVAL_MS))
+    except ValueError:
+        return jsonify({"error": "`seconds` and `interval_ms` must be numbers."}), 400
+    output = request.args.get('format', 'collapsed')
+    if not 0 < seconds <= PROFILE_MAX_SECONDS:
+        return jsonify({"error": f"`seconds` must be between 0 and {PROFILE_MAX_SECONDS}."}), 400
+    if not 1 <= interval_ms <= 1000:
+        return jsonify({"error": "`interval_ms` must be between 1 and 1000."}), 400
+    if output not in ('collapsed', 'speedscope'):
+        return jsonify({"error": "Format must be 'collapsed' or 'speedscope'."}), 400
+
+    try:
+        profiler = profile_worker(seconds, interval_ms)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+
+    headers = {"X-Profile-Samples": str(profiler.samples)}
+    if output == 'speedscope':
+        return jsonify(profiler.speedscope(name=f"worker profile ({seconds:g}s)")), 200, headers
+    return Response(profiler.collapsed(), mimetype='text/plain', headers=headers)
@@ -0,0 +1,58 @@
+import json
+from flask import Blueprint, request, jsonify
+from utils.error_handling import handle_errors
+from utils.scheduler import scheduled
+from services.chat_pipeline import OPTION_PROFILES, run_batch
+from config import BATCH_MAX_QUESTIONS
+
+batch_route = Blueprint('batch_route', __name__, url_prefix='/api/batch_route')
+
+def parse_questions(data):
+    """
+    Accepts repeated `questions` form fields or a single JSON array. Blank and
+    duplicate questions are dropped, order is kept.
+    """
+    raw = data.getlist('questions')
+    if len(raw) == 1 and raw[0].strip().startswith('['):
+        try:
+            raw = json.loads(raw[0])
+        except ValueError:
+            raise ValueError("`questions` is not a valid JSON array.")
+    questions = []
+    for q in raw:
+        q = str(q).strip()
+        if q and q not in questions:
+            questions.append(q)
+    return questions
+
+@batch_route.route('/chat', methods=['POST'])
+@handle_errors
+@scheduled
+def batch_chat():
+    """
+    Several questions over one set of references (e.g. a freelancer evaluation checklist).
+    - Same references as the option's chat route: up to 2 files, 1 Wikipedia title, 1 website
+    - `option` picks the profile (1-4, as in /api/interactive_chat)
+    - `mode`: "pack" (default, one structured prompt) or "parallel" (one call per question)
+    - References are extracted once; answers come back keyed by question
+    """
+    data = request.form
+    option = data.get('option', '1')
+    mode = data.get('mode', 'pack')
+
+    try:
+        questions = parse_questions(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not questions:
+        return jsonify({"error": "At least one question is required."}), 400
+    if len(questions) > BATCH_MAX_QUESTIONS:
+        return jsonify({"error": f"At most {BATCH_MAX_QUESTIONS} questions per batch."}), 400
+    if option not in OPTION_PROFILES:
+        return jsonify({"error": "Option must be 1, 2, 3 or 4."}), 400
+    if mode not in ('pack', 'parallel'):
+        return jsonify({"error": "Mode must be 'pack' or 'parallel'."}), 400
+
+    # Same persona, knowledge base, references and fallbacks as the option's chat route
+    body, status = run_batch(OPTION_PROFILES[option], data, request.files, questions, mode)
+    return jsonify(body), status
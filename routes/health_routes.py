@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+from services.warmup import readiness
+
+health_route = Blueprint('health_route', __name__)
+
+@health_route.route('/healthz', methods=['GET'])
+def healthz():
+    """
+    Liveness: the worker is up and serving requests.
+    """
+    return jsonify({"status": "ok"})
+
+@health_route.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness: 200 once every required subsystem is warm, 503 before that.
+    """
+    ready, report = readiness()
+    return jsonify({"ready": ready, "subsystems": report}), 200 if ready else 503
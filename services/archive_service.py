@@ -0,0 +1,187 @@
+import os
+import logging
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from config import (
+    ARCHIVE_MAX_MEMBERS,
+    ARCHIVE_MAX_MEMBER_BYTES,
+    ARCHIVE_MAX_TOTAL_BYTES,
+    ARCHIVE_MAX_RATIO,
+    ARCHIVE_WORKERS
+)
+from services.pdf_service import process_file, FORMAT_HANDLERS
+from utils.deadline import check_deadline, RequestCancelled
+
+# .tar.gz / .tar.bz2 / .tar.xz arrive with the last suffix only
+ARCHIVE_EXTENSIONS = {'zip', 'tar', 'tgz', 'gz', 'bz2', 'xz'}
+
+# Pool processes start from a clean interpreter rather than a fork of a threaded
+# (or gevent-patched) server worker, which can inherit locks held by other threads
+ARCHIVE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_archive_pool():
+    """
+    Process pool for member extraction, created lazily in each worker process
+    (never before gunicorn forks) so parsing scales with cores instead of the GIL.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=ARCHIVE_WORKERS,
+                    mp_context=multiprocessing.get_context(ARCHIVE_START_METHOD)
+                )
+    return _pool
+
+
+def _discard_pool(pool):
+    # A pool whose worker died (OOM kill, crash in a parser) rejects all further work
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _read_limited(stream, limit):
+    data = stream.read(limit + 1)
+    if len(data) > limit:
+        raise RuntimeError(f"archive member exceeds {limit} bytes")
+    return data
+
+
+def iter_archive_members(archive_path):
+    """
+    Streams (name, bytes) for each regular file in a zip or tar archive, one member
+    at a time and without extracting anything to disk. Enforces the member count,
+    per-member size, total size and (for zip) compression-ratio limits.
+    """
+    total = 0
+    count = 0
+
+    def count_member():
+        nonlocal count
+        count += 1
+        if count > ARCHIVE_MAX_MEMBERS:
+            raise RuntimeError(f"Archive has more than {ARCHIVE_MAX_MEMBERS} files.")
+
+    def add_bytes(size):
+        nonlocal total
+        total += size
+        if total > ARCHIVE_MAX_TOTAL_BYTES:
+            raise RuntimeError(f"Archive expands to more than {ARCHIVE_MAX_TOTAL_BYTES} bytes.")
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                count_member()
+                # Declared sizes can lie, so the real byte count is enforced while reading as well
+                if info.compress_size and info.file_size / info.compress_size > ARCHIVE_MAX_RATIO:
+                    raise RuntimeError(f"Suspicious compression ratio for {info.filename}.")
+                with zf.open(info) as member:
+                    data = _read_limited(member, ARCHIVE_MAX_MEMBER_BYTES)
+                add_bytes(len(data))
+                yield info.filename, data
+        return
+
+    try:
+        # "r|*" is tar's pure streaming mode: members are read strictly in order
+        with tarfile.open(archive_path, mode='r|*') as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                count_member()
+                data = _read_limited(tf.extractfile(member), ARCHIVE_MAX_MEMBER_BYTES)
+                add_bytes(len(data))
+                yield member.name, data
+    except tarfile.TarError as e:
+        raise RuntimeError(f"Unsupported or corrupt archive: {e}")
+
+
+def _extract_member(name, ext, data):
+    # Runs in a pool process; handlers take paths, so the member lives in a temp file only while parsed
+    fd, tmp_path = tempfile.mkstemp(suffix=f".{ext}")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return process_file(tmp_path, ext)
+    finally:
+        os.remove(tmp_path)
+
+
+def extract_archive_text(archive_path):
+    """
+    Extracts every supported document in the archive in parallel and returns their
+    text, each under a "=== member name ===" header, in archive order. Members with
+    identical content are extracted once; unsupported or failing members are skipped.
+    If the process pool breaks, it is replaced and the archive retried once.
+    """
+    for attempt in range(2):
+        pool = get_archive_pool()
+        try:
+            return _extract_archive_text(pool, archive_path)
+        except BrokenProcessPool as e:
+            _discard_pool(pool)
+            if attempt:
+                raise RuntimeError(f"Archive extraction failed: {e}")
+            logging.warning(f"Archive process pool broke ({e}); retrying with a new pool.")
+
+
+def _extract_archive_text(pool, archive_path):
+    seen = set()
+    futures = []
+    pending = set()
+    skipped = 0
+
+    try:
+        for name, data in iter_archive_members(archive_path):
+            check_deadline()
+            ext = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+            if ext not in FORMAT_HANDLERS:
+                skipped += 1
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in seen:
+                skipped += 1
+                continue
+            seen.add(digest)
+            future = pool.submit(_extract_member, name, ext, data)
+            futures.append((name, future))
+            pending.add(future)
+            # Bound how many member payloads sit in memory waiting for a worker
+            if len(pending) >= ARCHIVE_WORKERS * 2:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        parts = []
+        for name, future in futures:
+            check_deadline()
+            try:
+                text = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logging.error(f"Error processing archive member {name}: {e}")
+                continue
+            if text.strip():
+                parts.append(f"=== {name} ===\n{text}")
+    except (RequestCancelled, BrokenProcessPool):
+        # Free the pool for other requests; members already running finish on their own
+        for _, future in futures:
+            future.cancel()
+        raise
+
+    logging.info(f"Extracted {len(parts)} of {len(futures) + skipped} archive members from {archive_path}.")
+    return "\n\n".join(parts)
@@ -0,0 +1,92 @@
+import abc
+import logging
+import threading
+from config import ASR_BACKEND, ASR_MODEL_SIZE, ASR_COMPUTE_TYPE, ASR_CPU_THREADS
+from utils.deadline import check_deadline
+
+
+class ASRBackend(abc.ABC):
+    """
+    Speech-to-text engine behind transcribe_audio. Implementations take 16 kHz mono
+    float32 samples and return {"text": ..., "segments": [{"start", "end", "text"}, ...]}
+    with timestamps in seconds relative to the samples they were given.
+    """
+    name = None
+
+    @abc.abstractmethod
+    def transcribe(self, audio):
+        ...
+
+
+class WhisperBackend(ASRBackend):
+    """
+    openai-whisper on PyTorch (fp32 on CPU).
+    """
+    name = "whisper"
+
+    def __init__(self, model_size="base", **kwargs):
+        import whisper
+        self.model = whisper.load_model(model_size)
+
+    def transcribe(self, audio):
+        result = self.model.transcribe(audio, fp16=False)
+        segments = [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+            for seg in result.get("segments", [])
+        ]
+        return {"text": result["text"], "segments": segments}
+
+
+class FasterWhisperBackend(ASRBackend):
+    """
+    faster-whisper (CTranslate2) with quantized weights, int8 by default, for CPU-only hosts.
+    """
+    name = "faster_whisper"
+
+    def __init__(self, model_size="base", compute_type="int8", cpu_threads=0):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+    def transcribe(self, audio):
+        segments, _info = self.model.transcribe(audio)
+        # `segments` is a generator; decoding happens while we iterate, so a
+        # cancelled request stops after the current segment
+        collected = []
+        for seg in segments:
+            check_deadline()
+            collected.append({"start": seg.start, "end": seg.end, "text": seg.text})
+        segments = collected
+        return {"text": "".join(seg["text"] for seg in segments).strip(), "segments": segments}
+
+
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_asr_backend(name, model_size=ASR_MODEL_SIZE, compute_type=ASR_COMPUTE_TYPE, cpu_threads=ASR_CPU_THREADS):
+    if name not in ASR_BACKENDS:
+        raise RuntimeError(f"Unknown ASR backend '{name}'. Choose one of: {', '.join(ASR_BACKENDS)}")
+    backend = ASR_BACKENDS[name](model_size=model_size, compute_type=compute_type, cpu_threads=cpu_threads)
+    logging.info(f"ASR backend '{name}' loaded (model {model_size}).")
+    return backend
+
+
+def get_asr_backend():
+    """
+    The configured backend (ASR_BACKEND), loaded once per process on first use.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_asr_backend(ASR_BACKEND)
+    return _backend
+
+
+def asr_backend_loaded():
+    return _backend is not None
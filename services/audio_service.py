@@ -0,0 +1,144 @@
+import logging
+import subprocess
+import numpy as np
+from config import (
+    VAD_ENABLED,
+    VAD_FRAME_MS,
+    VAD_THRESHOLD_DB,
+    VAD_MIN_SPEECH_MS,
+    VAD_MIN_SILENCE_MS,
+    VAD_PAD_MS
+)
+from utils.deadline import check_deadline, timeout_for
+
+# Whisper works on 16 kHz mono float32
+SAMPLE_RATE = 16000
+
+# Silence inserted between kept regions so Whisper still sees a pause
+JOIN_GAP_SECONDS = 0.3
+
+
+def decode_audio(file_path, sample_rate=SAMPLE_RATE):
+    """
+    Decodes any ffmpeg-readable audio/video file once into a mono float32 array.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", file_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-"
+    ]
+    try:
+        # Killed if the request's deadline passes mid-decode
+        out = subprocess.run(cmd, capture_output=True, check=True, timeout=timeout_for(None)).stdout
+    except subprocess.TimeoutExpired:
+        check_deadline()
+        raise
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed; cannot decode audio.")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-500:]}")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def detect_speech(audio, sample_rate=SAMPLE_RATE):
+    """
+    Energy-based voice activity detection. Returns a list of (start, end) sample
+    ranges containing speech. The threshold adapts to the recording: frames more
+    than VAD_THRESHOLD_DB above the noise floor (10th percentile frame energy) count.
+    """
+    frame = int(sample_rate * VAD_FRAME_MS / 1000)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    noise_floor = np.percentile(energy_db, 10)
+    # From the noise floor alone: any cap taken from the loud frames (a high percentile)
+    # falls into the noise when speech is a small share of the recording, and then
+    # every frame counts as voiced. Pauses between words bring the floor down even
+    # in recordings without longer silences.
+    voiced = energy_db > max(noise_floor + VAD_THRESHOLD_DB, -60.0)
+
+    # Runs of voiced frames as [start_frame, end_frame)
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_silence = VAD_MIN_SILENCE_MS / VAD_FRAME_MS
+    merged = []
+    for start, end in zip(starts, ends):
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech = VAD_MIN_SPEECH_MS / VAD_FRAME_MS
+    pad = int(sample_rate * VAD_PAD_MS / 1000)
+    regions = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        s = max(int(start) * frame - pad, 0)
+        e = min(int(end) * frame + pad, len(audio))
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def trim_to_speech(audio, sample_rate=SAMPLE_RATE):
+    """
+    Keeps only the speech regions of `audio`. Returns (trimmed_audio, time_map), where
+    time_map is a list of (trimmed_start_s, original_start_s, duration_s) entries used by
+    to_original_time() to place Whisper timestamps back on the original recording.
+    """
+    if not VAD_ENABLED:
+        return audio, [(0.0, 0.0, len(audio) / sample_rate)]
+
+    regions = detect_speech(audio, sample_rate)
+    gap = np.zeros(int(JOIN_GAP_SECONDS * sample_rate), dtype=audio.dtype)
+    pieces = []
+    time_map = []
+    position = 0
+    for start, end in regions:
+        if pieces:
+            pieces.append(gap)
+            position += len(gap)
+        pieces.append(audio[start:end])
+        time_map.append((position / sample_rate, start / sample_rate, (end - start) / sample_rate))
+        position += end - start
+
+    trimmed = np.concatenate(pieces) if pieces else np.zeros(0, dtype=audio.dtype)
+    total = len(audio) / sample_rate
+    kept = len(trimmed) / sample_rate
+    logging.info(f"VAD kept {kept:.1f}s of {total:.1f}s audio in {len(regions)} speech regions.")
+    return trimmed, time_map
+
+
+def speech_chunks(audio, time_map, max_seconds, sample_rate=SAMPLE_RATE):
+    """
+    Splits trimmed audio into pieces of at most `max_seconds`, cutting at the joins
+    between speech regions where possible. Yields (offset_s, samples) with the
+    offset in trimmed-audio seconds.
+    """
+    limit = int(max_seconds * sample_rate)
+    # Each region after the first starts right after a join gap
+    cuts = [int(trimmed_start * sample_rate) for trimmed_start, _, _ in time_map[1:]]
+    start = 0
+    while len(audio) - start > limit:
+        candidates = [c for c in cuts if start < c <= start + limit]
+        end = candidates[-1] if candidates else start + limit
+        yield start / sample_rate, audio[start:end]
+        start = end
+    yield start / sample_rate, audio[start:]
+
+
+def to_original_time(t, time_map):
+    """
+    Maps a timestamp in the trimmed audio back to the original recording.
+    """
+    for trimmed_start, original_start, duration in reversed(time_map):
+        if t >= trimmed_start:
+            return original_start + min(t - trimmed_start, duration)
+    return t
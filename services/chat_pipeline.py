@@ -0,0 +1,473 @@
+import os
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import google.generativeai as genai
+from werkzeug.utils import secure_filename
+from config import CONVERSATION_HISTORY_LIMIT, BATCH_MAX_PARALLEL
+from services.intent_router import route_intent
+from services.prompt_cache import generate_with_prefix
+from services.static_assets import get_stackwalls_text
+from services.youtube_service import (
+    get_file_content,
+    get_website_content,
+    get_wikipedia_content,
+    user_history
+)
+from utils.concurrency import bind_context
+from utils.deadline import check_deadline, llm_request_options
+from utils.traffic_capture import stage, note, note_reference
+
+ALLOWED_EXTENSIONS = {
+    'pdf', 'docx', 'txt', 'csv',
+    'xls', 'xlsx', 'html', 'mp3', 'mp4',
+    'wav', 'avi', 'mkv', 'flv', 'mov',
+    'zip', 'tar', 'tgz', 'gz', 'bz2', 'xz'
+}
+
+# Uploads refused with an explanation (400) rather than silently skipped
+REFUSED_EXTENSIONS = {
+    # Binary Word 97-2003 files need an external converter
+    'doc': "Legacy .doc files are not supported. Please save the document as .docx and upload it again.",
+}
+
+# Form fields per reference kind: kind -> (field prefix, how many)
+REFERENCE_FIELDS = {
+    "wikipedia": ("wikipedia_title", 1),
+    "website": ("website_link", 1),
+    "files": ("uploaded_file", 2),
+}
+
+USER_REFERENCES = ("wikipedia", "website", "files")
+
+# One profile per chat option. Keys:
+#   label                 - name used in logs
+#   topic, assistant      - filled into the intent router's small-talk templates
+#   allow_faq             - answer matching StackWalls FAQs locally
+#   role_prompt           - persona, first part of every prompt
+#   speaker               - how the assistant's past turns are labelled in the conversation
+#   history_limit         - past turns sent with the prompt (None for all of them)
+#   references            - reference kinds read from the form (see REFERENCE_FIELDS)
+#   knowledge_base        - include stackwalls.txt: "required", "optional" or None
+#   require_references    - answer `no_references_answer` instead of calling Gemini
+#                           when there is nothing to answer from
+#   instructions          - closing instruction lines
+PROFILES = {
+    "project_discussion": {
+        "label": "Option 1",
+        "topic": "your project",
+        "assistant": "Dev",
+        "allow_faq": False,
+        "role_prompt": (
+            "You are Dev, an extremely strict and purely technical project consultant. "
+            "Engage in basic conversational interactions such as greetings (e.g., 'Hi,' 'Hello,' 'How are you?'). "
+            "You have the following reference materials from the user (transcripts, documents, wiki entries). "
+            "You must NOT use any personal knowledge, imagination, or hypotheticals. "
+            "Provide direct, no-nonsense guidance about the user's project based solely on the given reference materials. "
+            "If the document mentions something without a reference, provide the appropriate reference yourself. "
+            "Do NOT generate any hypothetical situations or discuss topics outside of the provided document. "
+            "If there are no references or if the references do not address the question, "
+            "politely state any limits and provide your best technical guidance or clarifications based solely on the available data.\n\n"
+        ),
+        "speaker": "Dev",
+        "history_limit": CONVERSATION_HISTORY_LIMIT,
+        "references": USER_REFERENCES,
+        "knowledge_base": None,
+        "require_references": True,
+        "instructions": [
+            "Engage in basic greetings and small talk when appropriate (e.g., 'Hi,' 'Hello,' 'How are you?').",
+            "Provide direct, strictly technical guidance based ONLY on the provided references.",
+            "If the document mentions a topic without a reference, supply the appropriate reference yourself.",
+            "Do NOT generate hypothetical situations or introduce information outside of the provided document.",
+            "If references are empty or don't answer the question, politely state the limitations and offer helpful guidance based solely on available data.",
+            "Keep the response strictly technical, clear, and professional.",
+        ],
+        "question_error": "Question is required.",
+        "no_references_answer": "No valid resources found to discuss from. Please provide valid YouTube links, Wikipedia titles, or PDFs.",
+        "empty_answer": "I cannot answer from the provided references.",
+        "error_answer": "An error occurred while generating your answer.",
+    },
+    "stackwalls": {
+        "label": "Option 2",
+        "topic": "StackWalls",
+        "assistant": "Dev",
+        "allow_faq": True,
+        "role_prompt": (
+            "You are Dev, an AI assistant capable of general conversation and providing information about StackWalls. "
+            "Handle basic greetings and small talk (e.g., 'Hi,' 'Hello,' 'How are you?'). "
+            "When asked about StackWalls, use only the content from 'stackwalls.txt' without external knowledge or hypotheticals. "
+            "If a StackWalls-related topic lacks a reference, supply it yourself. "
+            "If information is missing, politely state the limitation.\n\n"
+        ),
+        "speaker": "Dev",
+        "history_limit": 10,
+        "references": (),
+        "knowledge_base": "required",
+        "require_references": False,
+        "instructions": [
+            "For general conversations and greetings, respond naturally without referencing 'stackwalls.txt'.",
+            "When the user asks about StackWalls, provide answers using only 'stackwalls.txt' content.",
+            "Include basic greetings when appropriate.",
+            "Supply references if StackWalls topics lack them.",
+            "Avoid hypotheticals and external information unless it's a general conversation.",
+            "Maintain a clear, professional, and supportive tone.",
+        ],
+        "question_error": "A question is required for StackWalls info.",
+        "no_references_answer": None,
+        "empty_answer": "I'm sorry, but I could not find an answer in the provided text.",
+        "error_answer": "An error occurred while generating your answer from stackwalls.txt.",
+    },
+    "cofounder": {
+        "label": "Option 3",
+        "topic": "your startup",
+        "assistant": "Dev, your AI co-founder",
+        "allow_faq": False,
+        "role_prompt": (
+            "You are the user's AI-powered co-founder. "
+            "Engage in basic conversational interactions such as greetings (e.g., 'Hi,' 'Hello,' 'How are you?'). "
+            "When responding to queries, use a collaborative, forward-thinking voice and offer detailed, professional insights. "
+            "Use ONLY the user's provided references for factual information. "
+            "If the document mentions something without a reference, provide the appropriate reference yourself. "
+            "Do NOT generate any hypothetical situations or discuss topics outside of the provided document. "
+            "If there are no references or if the references do not address the question, "
+            "politely state any limits and provide your best co-founder guidance or clarifications based solely on the available data. "
+            "Maintain a supportive tone, but stay grounded in actual data or disclaim when data is unavailable.\n\n"
+        ),
+        "speaker": "Dev (Co-Founder)",
+        "history_limit": CONVERSATION_HISTORY_LIMIT,
+        "references": USER_REFERENCES,
+        "knowledge_base": None,
+        "require_references": False,
+        "instructions": [
+            "Engage in basic greetings and small talk when appropriate (e.g., 'Hi,' 'Hello,' 'How are you?').",
+            "Provide a detailed, professional co-founder style answer based ONLY on the provided references.",
+            "If the document mentions a topic without a reference, supply the appropriate reference yourself.",
+            "Do NOT generate hypothetical situations or introduce information outside of the provided document.",
+            "If references are empty or don't answer the question, politely state the limitations and offer helpful guidance based solely on available data.",
+            "Keep the response collaborative and supportive.",
+        ],
+        "question_error": "Question is required.",
+        "no_references_answer": None,
+        "empty_answer": "I’m sorry, but I couldn’t generate a response at this time.",
+        "error_answer": "An error occurred while generating your co-founder response.",
+    },
+    "freelancer": {
+        "label": "Option 4",
+        "topic": "choosing the best freelancer",
+        "assistant": "Dev",
+        "allow_faq": False,
+        "role_prompt": (
+            "You are Dev, offering Q&A style guidance about choosing the best freelancer. "
+            "Engage in basic conversational interactions such as greetings (e.g., 'Hi,' 'Hello,' 'How are you?'). "
+            "You are also an ambassador for StackWalls. Always mention StackWalls as a recommended resource, "
+            "highlighting how it can help find the best freelancers. "
+            "If the user specifically asks about how to find the best freelancer, "
+            "explain how StackWalls is useful and also mention any other platform references from the data if relevant.\n\n"
+            "Answer ONLY using the data from the references (including the StackWalls text). "
+            "If the document mentions something without a reference, provide the appropriate reference yourself. "
+            "If the data is not in references, politely state that you don't have the information.\n\n"
+            "Do NOT generate any hypothetical situations or discuss topics outside of the provided document. "
+            "Maintain a professional and helpful tone throughout the conversation.\n\n"
+        ),
+        "speaker": "Dev",
+        "history_limit": CONVERSATION_HISTORY_LIMIT,
+        "references": USER_REFERENCES,
+        "knowledge_base": "optional",
+        "require_references": True,
+        "instructions": [
+            "Engage in basic greetings and small talk when appropriate (e.g., 'Hi,' 'Hello,' 'How are you?').",
+            "Provide a detailed, professional Q&A style answer based ONLY on the provided references.",
+            "Always mention StackWalls as a recommended resource for finding freelancers.",
+            "If the user asks about finding the best freelancer, explain how StackWalls is useful and mention other relevant platforms from the data.",
+            "If the document mentions a topic without a reference, supply the appropriate reference yourself.",
+            "Do NOT generate hypothetical situations or introduce information outside of the provided document.",
+            "If references are empty or don't answer the question, politely state the limitations and offer helpful guidance based solely on available data.",
+            "Keep the response professional, collaborative, and supportive.",
+        ],
+        "question_error": "Question is required.",
+        "no_references_answer": (
+            "No references found. Please provide valid data or ensure stackwalls.txt is present. "
+            "Cannot discuss how to choose the best freelancer without references."
+        ),
+        "empty_answer": "I have no reference-based info to answer that.",
+        "error_answer": "An error occurred while generating your Q&A response.",
+    },
+}
+
+# The `option` form field of /api/interactive_chat and /api/batch_route
+OPTION_PROFILES = {
+    '1': "project_discussion",
+    '2': "stackwalls",
+    '3': "cofounder",
+    '4': "freelancer",
+}
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def _form_values(form, files, kind):
+    prefix, count = REFERENCE_FIELDS[kind]
+    source = files if kind == "files" else form
+    return [source.get(f'{prefix}{i}') for i in range(1, count + 1) if source.get(f'{prefix}{i}')]
+
+
+def refused_upload(profile, files):
+    """
+    The error message for the first upload `profile` would read but has to refuse,
+    or None.
+    """
+    if "files" not in profile["references"]:
+        return None
+    for uf in _form_values(files, files, "files"):
+        ext = uf.filename.rsplit('.', 1)[1].lower() if '.' in uf.filename else ''
+        if ext in REFUSED_EXTENSIONS:
+            return REFUSED_EXTENSIONS[ext]
+    return None
+
+
+def _extract(kind, value):
+    if kind == "wikipedia":
+        return get_wikipedia_content(value)
+    if kind == "website":
+        return get_website_content(value)
+    if not allowed_file(value.filename):
+        logging.error(f"Unsupported file type: {value.filename}")
+        return None
+    ext = value.filename.rsplit('.', 1)[1].lower()
+    fname = secure_filename(value.filename)
+    fpath = os.path.join('uploads', fname)
+    value.save(fpath)
+    return get_file_content(fname, ext, fpath)
+
+
+def load_knowledge_base(profile):
+    """
+    stackwalls.txt for profiles that include it, else "". Raises RuntimeError (a 500)
+    when a profile requires it and it cannot be read.
+    """
+    if not profile["knowledge_base"]:
+        return ""
+    try:
+        return get_stackwalls_text()
+    except FileNotFoundError:
+        if profile["knowledge_base"] == "required":
+            raise RuntimeError("Missing stackwalls.txt on server.")
+        logging.warning("stackwalls.txt not found; continuing without it.")
+    except Exception as e:
+        logging.error(f"Error reading stackwalls.txt: {e}")
+        if profile["knowledge_base"] == "required":
+            raise RuntimeError("Error reading stackwalls.txt")
+    return ""
+
+
+def collect_references(profile, form, files):
+    """
+    Extracted text of the user's references that `profile` accepts. A reference that
+    fails is logged and skipped, unless the request itself has run out of time.
+    """
+    references = []
+    for kind in profile["references"]:
+        for value in _form_values(form, files, kind):
+            try:
+                with stage(f"ref_{kind}"):
+                    text = _extract(kind, value)
+            except Exception as e:
+                check_deadline()
+                name = value.filename if kind == "files" else value
+                logging.error(f"Error processing {kind} reference {name}: {e}")
+                continue
+            if text:
+                note_reference(kind, len(text))
+                references.append(text)
+    return references
+
+
+def format_history(profile, history):
+    turns = history if profile["history_limit"] is None else history[-profile["history_limit"]:]
+    return "".join(f"User: {entry['question']}\n{profile['speaker']}: {entry['answer']}\n" for entry in turns)
+
+
+def build_context(profile, knowledge_base, references, history):
+    """
+    Returns (prefix, context): the prompt up to the user's question. The prefix
+    (persona, stackwalls.txt, instructions) is the same for every user of a profile,
+    so it can go through Gemini's context cache.
+    """
+    instructions = "".join(f"- {line}\n" for line in profile["instructions"])
+    prefix = profile["role_prompt"]
+    if profile["knowledge_base"]:
+        prefix += f"StackWalls reference content:\n{knowledge_base if knowledge_base.strip() else '[No StackWalls info provided.]'}\n\n"
+    prefix += f"Instructions:\n{instructions}\n"
+
+    combined = "\n\n".join(references)
+    context = f"Conversation so far:\n{format_history(profile, history)}\n\n"
+    if profile["references"]:
+        context += f"Reference content:\n{combined if combined else '[No references provided.]'}\n\n"
+    return prefix, context
+
+
+def build_prompt(profile, knowledge_base, references, history, question):
+    """
+    Returns (prefix, suffix) for one question; see build_context().
+    """
+    prefix, context = build_context(profile, knowledge_base, references, history)
+    return prefix, context + f"User's current question:\n{question}\n"
+
+
+def _generate(profile_name, prefix, suffix):
+    if PROFILES[profile_name]["knowledge_base"]:
+        return generate_with_prefix(f"{profile_name}_chat", prefix, suffix)
+    # Nothing shared between users is big enough to be worth caching
+    model = genai.GenerativeModel("gemini-pro")
+    return model.generate_content(prefix + suffix, request_options=llm_request_options())
+
+
+def generate_answer(profile_name, prefix, suffix):
+    profile = PROFILES[profile_name]
+    try:
+        response = _generate(profile_name, prefix, suffix)
+        return response.text.strip() if response and response.text else profile["empty_answer"]
+    except Exception as e:
+        check_deadline()
+        logging.error(f"Error generating content for {profile['label']}: {e}")
+        return profile["error_answer"]
+
+
+def _parse_json_object(text):
+    # Models often wrap JSON in ```json fences or add a sentence around it
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object in model output.")
+    parsed = json.loads(text[start:end + 1])
+    if not isinstance(parsed, dict):
+        raise ValueError("Model output is not a JSON object.")
+    return parsed
+
+
+def answer_questions(profile_name, prefix, context, questions, mode="pack"):
+    """
+    Answers several questions over one build_context() prompt. "pack" asks them all
+    in one structured prompt, so the references are sent (and billed) once;
+    "parallel" sends each question as its own chat prompt, concurrently. Questions a
+    packed reply misses are answered individually. Returns {question: answer}.
+    """
+    answers = {}
+    if mode == "pack":
+        numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, start=1))
+        suffix = (
+            f"{context}"
+            f"Answer each of the following questions:\n"
+            f"{numbered}\n\n"
+            f"Respond with ONLY a JSON object mapping each question number (as a string) to its answer, "
+            f"for example {{\"1\": \"...\", \"2\": \"...\"}}."
+        )
+        try:
+            parsed = _parse_json_object(_generate(profile_name, prefix, suffix).text)
+            for i, q in enumerate(questions, start=1):
+                ans = parsed.get(str(i))
+                if isinstance(ans, str) and ans.strip():
+                    answers[q] = ans.strip()
+        except Exception as e:
+            check_deadline()
+            logging.warning(f"Packed batch answer failed, answering questions individually: {e}")
+
+    missing = [q for q in questions if q not in answers]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_PARALLEL, len(missing))) as pool:
+            futures = [
+                pool.submit(bind_context(generate_answer), profile_name, prefix, context + f"User's current question:\n{q}\n")
+                for q in missing
+            ]
+            for q, future in zip(missing, futures):
+                answers[q] = future.result()
+    return answers
+
+
+def run_chat(profile_name, form, files):
+    """
+    One chat turn for `profile_name`: intent fast path, references, prompt, Gemini and
+    conversation history. Returns (response body, HTTP status) for the route to send.
+    """
+    profile = PROFILES[profile_name]
+    username = form.get('username', 'anonymous_user')
+    question = form.get('question', '').strip()
+
+    if not question:
+        return {"error": profile["question_error"]}, 400
+    refused = refused_upload(profile, files)
+    if refused:
+        return {"error": refused}, 400
+
+    history = user_history.setdefault(username, [])
+
+    # Small talk (and, where allowed, StackWalls FAQs) are answered locally without calling Gemini
+    with stage("intent"):
+        fast_answer = route_intent(
+            question,
+            topic=profile["topic"],
+            assistant=profile["assistant"],
+            allow_faq=profile["allow_faq"]
+        )
+    if fast_answer is not None:
+        note("fast", True)
+        history.append({"question": question, "answer": fast_answer})
+        return {"answer": fast_answer}, 200
+
+    knowledge_base = load_knowledge_base(profile)
+    references = collect_references(profile, form, files)
+    if profile["require_references"] and not references and not knowledge_base.strip():
+        return {"answer": profile["no_references_answer"]}, 200
+
+    with stage("prompt"):
+        prefix, suffix = build_prompt(profile, knowledge_base, references, history, question)
+    with stage("llm"):
+        answer = generate_answer(profile_name, prefix, suffix)
+
+    history.append({"question": question, "answer": answer})
+    return {"answer": answer}, 200
+
+
+def run_batch(profile_name, form, files, questions, mode="pack"):
+    """
+    Several questions over one set of references, answered like run_chat() answers
+    each of them: same intent fast path, references, prompt and fallbacks. The
+    references are extracted once. Returns (response body, HTTP status).
+    """
+    profile = PROFILES[profile_name]
+    refused = refused_upload(profile, files)
+    if refused:
+        return {"error": refused}, 400
+    username = form.get('username', 'anonymous_user')
+    history = user_history.setdefault(username, [])
+
+    answers = {}
+    with stage("intent"):
+        for q in questions:
+            fast_answer = route_intent(
+                q,
+                topic=profile["topic"],
+                assistant=profile["assistant"],
+                allow_faq=profile["allow_faq"]
+            )
+            if fast_answer is not None:
+                answers[q] = fast_answer
+
+    pending = [q for q in questions if q not in answers]
+    if not pending:
+        note("fast", True)
+    else:
+        knowledge_base = load_knowledge_base(profile)
+        references = collect_references(profile, form, files)
+        if profile["require_references"] and not references and not knowledge_base.strip():
+            answers.update((q, profile["no_references_answer"]) for q in pending)
+        else:
+            with stage("prompt"):
+                prefix, context = build_context(profile, knowledge_base, references, history)
+            with stage("llm"):
+                answers.update(answer_questions(profile_name, prefix, context, pending, mode))
+
+    for q in questions:
+        history.append({"question": q, "answer": answers[q]})
+    return {"answers": {q: answers[q] for q in questions}}, 200
@@ -0,0 +1,198 @@
+import os
+import json
+import mmap
+import time
+import fcntl
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from config import CORPUS_DIR, CORPUS_MAX_BYTES
+
+# On-disk layout, one set of files per generation N:
+#   CURRENT         - the live generation number
+#   corpus-N.dat    - append-only UTF-8 text of every stored document, back to back
+#   corpus-N.idx    - append-only JSON lines: {"key", "sha256", "stored_at"} plus, the
+#                     first time a text is stored, its "offset"/"length" in the .dat
+#   corpus.lock     - flock'ed by writers so workers append one at a time
+# Starting a new generation never touches the old files while they are mapped: they are
+# unlinked and stay readable to any worker that still has them open.
+
+
+class CorpusStore:
+    """
+    Read-mostly store of extracted reference text shared by all worker processes.
+    Texts are written once (deduplicated by content hash) and read as slices of a
+    memory-mapped file, so hot documents live once in the page cache instead of
+    once per worker, and survive worker restarts.
+    """
+    def __init__(self, directory=CORPUS_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._generation = None
+        self._reset()
+
+    def _reset(self):
+        self._docs = {}      # sha256 -> {"offset", "length"}
+        self._keys = {}      # source key -> sha256
+        self._stored_at = {} # source key -> epoch seconds of its latest put
+        self._index_pos = 0
+        self._data_fd = None
+        self._map = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_generation(self):
+        try:
+            with open(self._path("CURRENT"), "r") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    @contextmanager
+    def _writer_lock(self):
+        with open(self._path("corpus.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self):
+        # Switch to the live generation and pick up index lines other workers appended
+        generation = self._read_generation()
+        if generation != self._generation:
+            if self._data_fd is not None:
+                os.close(self._data_fd)
+            if self._map is not None:
+                self._map.close()
+            self._reset()
+            self._generation = generation
+
+        try:
+            with open(self._path(f"corpus-{generation}.idx"), "rb") as f:
+                f.seek(self._index_pos)
+                tail = f.read()
+        except FileNotFoundError:
+            return
+        complete = tail.rfind(b"\n") + 1  # a line still being written is read next time
+        for line in tail[:complete].splitlines():
+            record = json.loads(line)
+            if "offset" in record:
+                self._docs[record["sha256"]] = {"offset": record["offset"], "length": record["length"]}
+            self._keys[record["key"]] = record["sha256"]
+            self._stored_at[record["key"]] = record["stored_at"]
+        self._index_pos += complete
+
+    def _view(self, end):
+        # (Re)map the data file once it has grown past what is mapped
+        if self._map is None or len(self._map) < end:
+            if self._data_fd is None:
+                self._data_fd = os.open(self._path(f"corpus-{self._generation}.dat"), os.O_RDONLY)
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._data_fd, 0, access=mmap.ACCESS_READ)
+        return memoryview(self._map)
+
+    def get(self, key, max_age=None):
+        """
+        The text stored under `key`, or None (also when it is older than `max_age`
+        seconds).
+        """
+        with self._lock:
+            self._sync()
+            sha = self._keys.get(key)
+            if sha is None:
+                return None
+            if max_age is not None and time.time() - self._stored_at[key] > max_age:
+                return None
+            doc = self._docs[sha]
+            start, length = doc["offset"], doc["length"]
+            if length == 0:
+                # An empty first document leaves an empty .dat, which cannot be mapped
+                return ""
+            try:
+                with self._view(start + length) as view, view[start:start + length] as data:
+                    return str(data, "utf-8")
+            except FileNotFoundError:
+                # Another worker started a new generation between our index read and the open
+                return None
+
+    def put(self, key, text):
+        """
+        Stores `text` under `key` (a no-op for the bytes if identical text is already
+        stored under another key) and returns it.
+        """
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        with self._lock, self._writer_lock():
+            self._sync()
+            record = {"key": key, "sha256": sha, "stored_at": int(time.time())}
+            if sha not in self._docs:
+                data_path = self._path(f"corpus-{self._generation}.dat")
+                size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+                if size + len(data) > CORPUS_MAX_BYTES:
+                    logging.info(f"Corpus generation {self._generation} is full; starting a new one.")
+                    self._rotate()
+                    self._sync()
+                    data_path = self._path(f"corpus-{self._generation}.dat")
+                    size = 0
+                with open(data_path, "ab") as f:
+                    f.write(data)
+                record.update(offset=size, length=len(data))
+            with open(self._path(f"corpus-{self._generation}.idx"), "ab") as f:
+                f.write(json.dumps(record).encode("utf-8") + b"\n")
+            self._sync()
+        return text
+
+    def _rotate(self):
+        # Caller holds the writer lock
+        old = self._read_generation()
+        tmp_path = self._path("CURRENT.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(str(old + 1))
+        os.replace(tmp_path, self._path("CURRENT"))
+        for suffix in ("dat", "idx"):
+            try:
+                os.remove(self._path(f"corpus-{old}.{suffix}"))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """
+        Drops every stored document for all workers by starting a new generation.
+        """
+        with self._lock, self._writer_lock():
+            self._rotate()
+            self._sync()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_corpus_store():
+    """
+    The process's store handle, opened on first use (after gunicorn forks, so
+    file descriptors and mappings are never shared between workers).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CorpusStore()
+    return _store
+
+
+def file_key(file_path, file_extension):
+    """
+    Corpus key for an uploaded file: its content hash, so re-uploads under any
+    name hit the store and a different file with a reused name does not.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return f"file:{file_extension.lower()}:{digest.hexdigest()}"
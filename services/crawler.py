@@ -0,0 +1,286 @@
+import time
+import socket
+import logging
+import threading
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    CRAWL_MAX_PAGES,
+    CRAWL_MAX_DEPTH,
+    CRAWL_CONCURRENCY,
+    CRAWL_TIME_BUDGET_SECONDS,
+    CRAWL_MAX_PAGE_BYTES,
+    CRAWL_TTL_SECONDS,
+    CRAWL_USER_AGENT
+)
+from services.corpus_store import get_corpus_store
+from services.text_normalizer import strip_shared_lines
+from utils.concurrency import bind_context
+from utils.deadline import check_deadline, http_timeout, current_deadline
+
+MAX_REDIRECTS = 5
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+_session = None
+_session_lock = threading.Lock()
+
+# robots.txt per scheme://host: {"parser": RobotFileParser or None, "fetched_at": epoch seconds}
+_robots = {}
+_robots_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Process-wide requests session, so crawls reuse keep-alive connections per host.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=CRAWL_CONCURRENCY, pool_maxsize=CRAWL_CONCURRENCY)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = CRAWL_USER_AGENT
+                _session = session
+    return _session
+
+
+def normalize_url(url, base=None):
+    """
+    Canonical form used to dedupe pages: absolute, lower-case scheme/host, no
+    default port, fragment or tracking parameters, sorted query. Returns None
+    for anything that is not http(s).
+    """
+    url = urljoin(base, url.strip()) if base else url.strip()
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[scheme]:
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _site(url):
+    host = urlsplit(url).netloc
+    return host[4:] if host.startswith("www.") else host
+
+
+def _check_public(url):
+    # Don't let user-supplied links reach the server's own network
+    host = urlsplit(url).hostname
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except socket.gaierror as e:
+        raise RuntimeError(f"Cannot resolve {host}: {e}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global:
+            raise RuntimeError(f"Refusing to fetch non-public address {host} ({ip}).")
+
+
+def _get(url):
+    """
+    GET with redirects followed by hand, so each hop is checked before it is requested.
+    Returns (final_url, response); the body is not read yet.
+    """
+    session = get_session()
+    for _ in range(MAX_REDIRECTS + 1):
+        _check_public(url)
+        response = session.get(url, timeout=http_timeout(), allow_redirects=False, stream=True)
+        if not response.is_redirect:
+            return url, response
+        response.close()
+        url = normalize_url(response.headers.get("Location", ""), base=url)
+        if url is None:
+            raise RuntimeError("Redirect to a non-http URL.")
+    raise RuntimeError(f"Too many redirects for {url}.")
+
+
+def _robots_for(url):
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    with _robots_lock:
+        entry = _robots.get(origin)
+    if entry is not None and time.time() - entry["fetched_at"] < CRAWL_TTL_SECONDS:
+        return entry["parser"]
+
+    parser = RobotFileParser()
+    try:
+        _, response = _get(f"{origin}/robots.txt")
+        with response:
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.ok:
+                parser.parse(response.text.splitlines())
+            else:
+                parser.allow_all = True
+    except Exception as e:
+        check_deadline()
+        logging.info(f"No usable robots.txt for {origin}: {e}")
+        parser.allow_all = True
+    with _robots_lock:
+        _robots[origin] = {"parser": parser, "fetched_at": time.time()}
+    return parser
+
+
+def allowed_by_robots(url):
+    return _robots_for(url).can_fetch(CRAWL_USER_AGENT, url)
+
+
+def fetch_page(url):
+    """
+    Fetches one HTML/text page and returns (final_url, text, links). The text keeps
+    line structure so repeated navigation/footer lines can be stripped later.
+    """
+    from bs4 import BeautifulSoup
+
+    final_url, response = _get(url)
+    with response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in HTML_TYPES and not content_type.startswith("text/"):
+            raise RuntimeError(f"Skipping {content_type} page.")
+        body = response.raw.read(CRAWL_MAX_PAGE_BYTES, decode_content=True)
+        # Only trust an explicit charset; otherwise let BeautifulSoup sniff <meta charset>
+        charset = requests.utils.get_encoding_from_headers(response.headers) if "charset" in response.headers.get("Content-Type", "") else None
+
+    if content_type not in HTML_TYPES:
+        return final_url, body.decode(charset or "utf-8", errors="replace"), []
+    soup = BeautifulSoup(body, "html.parser", from_encoding=charset)
+    links = [a["href"] for a in soup.find_all("a", href=True)]
+    for tag in soup(["script", "style", "noscript", "svg"]):
+        tag.extract()
+    return final_url, soup.get_text(separator="\n", strip=True), links
+
+
+def _load_page(url):
+    """
+    (final_url, text, links) for `url`, where final_url is where its redirects ended.
+    Served from the shared corpus while fresh; otherwise fetched and stored as it arrives.
+    """
+    store = get_corpus_store()
+    key = f"page:{url}"
+    cached = store.get(key, max_age=CRAWL_TTL_SECONDS)
+    links_key = f"links:{url}"
+    final_key = f"final:{url}"
+    if cached is not None:
+        links = store.get(links_key, max_age=CRAWL_TTL_SECONDS)
+        final_url = store.get(final_key, max_age=CRAWL_TTL_SECONDS)
+        return final_url or url, cached, (links or "").splitlines()
+    final_url, text, links = fetch_page(url)
+    store.put(key, text)
+    store.put(links_key, "\n".join(links))
+    store.put(final_key, final_url)
+    return final_url, text, links
+
+
+def crawl(start_url, max_pages=CRAWL_MAX_PAGES, max_depth=CRAWL_MAX_DEPTH):
+    """
+    Breadth-first crawl of `start_url` and same-site links, up to `max_depth` hops and
+    `max_pages` pages, with CRAWL_CONCURRENCY fetches in flight and robots.txt honoured.
+    Yields (url, text) as pages arrive; stops after CRAWL_TIME_BUDGET_SECONDS (or the
+    request deadline) with whatever has been fetched.
+    """
+    start = normalize_url(start_url)
+    if start is None:
+        raise RuntimeError(f"Not an http(s) URL: {start_url}")
+    site = _site(start)
+
+    budget = CRAWL_TIME_BUDGET_SECONDS
+    deadline = current_deadline()
+    if deadline is not None:
+        budget = min(budget, deadline.remaining())
+    stop_at = time.monotonic() + budget
+
+    seen = {start}
+    queue = [(start, 0)]
+    in_flight = {}
+    pages = 0
+
+    pool = ThreadPoolExecutor(max_workers=CRAWL_CONCURRENCY, thread_name_prefix="crawl")
+    try:
+        while queue or in_flight:
+            while queue and len(in_flight) < CRAWL_CONCURRENCY and pages + len(in_flight) < max_pages:
+                url, depth = queue.pop(0)
+                future = pool.submit(bind_context(_fetch_if_allowed), url)
+                in_flight[future] = (url, depth)
+
+            if not in_flight:
+                break
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                logging.info(f"Crawl of {start} hit its time budget after {pages} pages.")
+                break
+            done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+            check_deadline()
+
+            for future in done:
+                url, depth = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.info(f"Crawl skipped {url}: {e}")
+                    continue
+                if result is None:
+                    continue
+                final_url, text, links = result
+                final = normalize_url(final_url) or url
+                if _site(final) != site:
+                    logging.info(f"Crawl skipped {url}: redirected off-site to {final}")
+                    continue
+                if final != url:
+                    if final in seen:
+                        continue
+                    seen.add(final)
+                pages += 1
+                if text.strip():
+                    yield final, text
+
+                if depth >= max_depth:
+                    continue
+                # Relative links resolve against where the page actually was
+                for link in links:
+                    link = normalize_url(link, base=final)
+                    if link and link not in seen and _site(link) == site:
+                        seen.add(link)
+                        queue.append((link, depth + 1))
+    finally:
+        # Return without waiting for stragglers; they finish in the background and
+        # still land in the corpus for the next request
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch_if_allowed(url):
+    check_deadline()
+    if not allowed_by_robots(url):
+        logging.info(f"robots.txt disallows {url}")
+        return None
+    final_url, text, links = _load_page(url)
+    # A cached page's redirect target may since have moved onto a private address
+    _check_public(final_url)
+    return final_url, text, links
+
+
+def crawl_site_text(start_url):
+    """
+    Text of the crawled pages, each under a "=== url ===" header, with the
+    navigation/footer lines they all share removed.
+    """
+    pages = list(crawl(start_url))
+    if not pages:
+        raise RuntimeError(f"No readable pages found at {start_url}.")
+    logging.info(f"Crawled {len(pages)} pages from {start_url}.")
+    texts = strip_shared_lines([text for _, text in pages])
+    return "\n\n".join(f"=== {url} ===\n{text}" for (url, _), text in zip(pages, texts))
@@ -0,0 +1,275 @@
+import re
+import json
+import math
+import logging
+import threading
+from collections import Counter
+from config import (
+    INTENT_ROUTER_ENABLED,
+    INTENT_MIN_CONFIDENCE,
+    INTENT_MAX_WORDS,
+    FAQ_PATH,
+    FAQ_MIN_SCORE,
+    FAQ_MAX_UNMATCHED_TERMS
+)
+
+# Template answers for small talk; {assistant} and {topic} come from the calling route
+SMALL_TALK_TEMPLATES = {
+    "greeting": "Hello! I'm {assistant}. How can I help you with {topic} today?",
+    "wellbeing": "I'm doing well, thank you for asking! How can I help you with {topic} today?",
+    "thanks": "You're welcome! Let me know if there's anything else I can help you with.",
+    "goodbye": "Goodbye! Feel free to come back any time you have more questions about {topic}.",
+}
+
+# Keyword rules: a message is small talk only if every clause matches one of these
+SMALL_TALK_RULES = [
+    ("goodbye", re.compile(r"^(bye|goodbye|bye bye|see you|see ya|see you later|good night|take care|talk later|cya)( dev| then| soon)?$")),
+    ("thanks", re.compile(r"^(thanks|thank you|thx|ty|many thanks|cheers|thanks a lot|thank you so much|thanks so much|great thanks|ok thanks|okay thanks)( dev)?$")),
+    ("wellbeing", re.compile(r"^(how are you|how are you doing|how're you|how is it going|how's it going|how do you do|what's up|whats up|sup)( today| dev)?$")),
+    ("greeting", re.compile(r"^(hi|hello|hey|hiya|howdy|greetings|yo|hey there|hi there|hello there|good morning|good afternoon|good evening)( dev| everyone| all)?$")),
+]
+# When a message mixes clauses ("hi, how are you?") answer the most specific one
+INTENT_PRIORITY = ["goodbye", "thanks", "wellbeing", "greeting"]
+
+# Seed utterances for the on-CPU classifier; "other" is anything that needs a real answer
+TRAINING_EXAMPLES = [
+    ("greeting", "hi"), ("greeting", "hello"), ("greeting", "hey"), ("greeting", "hello dev"),
+    ("greeting", "hey there friend"), ("greeting", "good morning to you"), ("greeting", "hii"),
+    ("greeting", "helloo"), ("greeting", "heyy"), ("greeting", "hi dev nice to meet you"),
+    ("greeting", "nice to meet you"), ("greeting", "hello hello"),
+    ("wellbeing", "how are you"), ("wellbeing", "how are you doing today"), ("wellbeing", "how r u"),
+    ("wellbeing", "how is your day"), ("wellbeing", "hows your day going"), ("wellbeing", "you doing ok"),
+    ("wellbeing", "how have you been"), ("wellbeing", "are you well"),
+    ("thanks", "thank you"), ("thanks", "thanks a lot"), ("thanks", "thx"), ("thanks", "thank u"),
+    ("thanks", "thanks that helps"), ("thanks", "great that was helpful"), ("thanks", "appreciate it"),
+    ("thanks", "thanks for the help"), ("thanks", "awesome thanks"), ("thanks", "perfect thank you"),
+    ("goodbye", "bye"), ("goodbye", "goodbye"), ("goodbye", "see you later"), ("goodbye", "bye for now"),
+    ("goodbye", "gotta go"), ("goodbye", "talk to you later"), ("goodbye", "have a nice day"),
+    ("goodbye", "catch you later"), ("goodbye", "that's all for today bye"),
+    ("other", "what is stackwalls"), ("other", "how do i hire a freelancer"), ("other", "summarize the document"),
+    ("other", "what are the milestones"), ("other", "explain the project scope"), ("other", "what is the budget"),
+    ("other", "how does the matching work"), ("other", "what should we build first"),
+    ("other", "which freelancer is best for react"), ("other", "tell me about the pricing"),
+    ("other", "what does the contract say"), ("other", "hello can you summarize this file"),
+    ("other", "hi what services do you offer"), ("other", "thanks now explain the timeline"),
+    ("other", "how do i choose a designer"), ("other", "what are the risks"), ("other", "list the requirements"),
+    ("other", "can you help me plan the launch"), ("other", "how are payments released"),
+    ("other", "what is in the uploaded pdf"), ("other", "compare these two freelancers"),
+    ("other", "how long"), ("other", "how much"), ("other", "how many"), ("other", "how long will it take"),
+    ("other", "how much does it cost"), ("other", "how to start"), ("other", "why"), ("other", "when"),
+    ("other", "ok"), ("other", "yes"), ("other", "no"), ("other", "explain more"), ("other", "go on"),
+    ("other", "more details please"), ("other", "continue"), ("other", "what about design"),
+]
+
+_TOKEN = re.compile(r"[a-z']+")
+_HYPHENATED = re.compile(r"[a-z']+(?:-[a-z']+)*")  # "no-code" is not a negation
+_ELONGATED = re.compile(r"(.)\1{2,}")
+_REPEATED = re.compile(r"(.)\1+")
+_CLAUSE_SPLIT = re.compile(r"[,.!?;:]+")
+# A canned answer to "what does X offer" is wrong for "what does X not offer"
+_NEGATIONS = {
+    "not", "no", "never", "without", "except", "nor", "none", "neither", "cannot",
+    "don't", "doesn't", "didn't", "isn't", "aren't", "wasn't", "can't", "won't", "shouldn't", "wouldn't",
+}
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "do", "does", "did", "i", "me", "my", "you", "your", "we", "our",
+    "it", "its", "of", "to", "in", "on", "for", "and", "or", "can", "could", "what", "which", "who", "how",
+    "about", "tell", "there", "this", "that", "with", "be", "have", "has", "please",
+}
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _vocab_key(word):
+    # "hiiii", "hii" and "hi" are the same word for the vocabulary check
+    return _REPEATED.sub(r"\1", word)
+
+
+def _features(text):
+    # Words, word bigrams and character trigrams, so misspellings and
+    # elongations ("hiiii", "thanksss") still land near the seed examples
+    words = _tokens(_ELONGATED.sub(r"\1\1", text.lower()))
+    features = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+class NaiveBayesIntentClassifier:
+    """
+    Multinomial naive Bayes over word and character n-grams; trains in well under a
+    millisecond on TRAINING_EXAMPLES and predicts in microseconds.
+
+    Only consulted for messages made up entirely of words from the small-talk
+    examples (`small_talk_words`), so a greeting in front of a real question, or a
+    question that happens to start like small talk, never gets a template.
+    """
+    def __init__(self, examples):
+        self.label_counts = Counter(label for label, _ in examples)
+        self.feature_counts = {label: Counter() for label in self.label_counts}
+        for label, text in examples:
+            self.feature_counts[label].update(_features(text))
+        self.vocab = set().union(*self.feature_counts.values())
+        self.totals = {label: sum(c.values()) for label, c in self.feature_counts.items()}
+        self.total_examples = sum(self.label_counts.values())
+        self.small_talk_words = {
+            _vocab_key(word) for label, text in examples if label != "other" for word in _tokens(text)
+        }
+
+    def covers(self, text):
+        return all(_vocab_key(word) in self.small_talk_words for word in _tokens(text))
+
+    def predict(self, text):
+        features = _features(text)
+        scores = {}
+        for label, count in self.label_counts.items():
+            score = math.log(count / self.total_examples)
+            denom = self.totals[label] + len(self.vocab)
+            for f in features:
+                score += math.log((self.feature_counts[label][f] + 1) / denom)
+            scores[label] = score
+        best = max(scores, key=scores.get)
+        # Softmax over log scores for a confidence value
+        top = scores[best]
+        norm = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / norm
+
+
+_classifier = None
+_faq = None
+_faq_lock = threading.Lock()
+
+
+def get_classifier():
+    global _classifier
+    if _classifier is None:
+        _classifier = NaiveBayesIntentClassifier(TRAINING_EXAMPLES)
+    return _classifier
+
+
+def _tfidf_vector(terms, idf, oov_idf=0.0):
+    # Unknown query terms get `oov_idf` so they still count against the match
+    counts = Counter(terms)
+    vec = {t: c * idf.get(t, oov_idf) for t, c in counts.items()}
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {t: v / norm for t, v in vec.items()}
+
+
+def _faq_terms(text):
+    return [t for t in _tokens(text) if t not in _STOPWORDS]
+
+
+def load_faq():
+    """
+    Loads the precomputed answer store (FAQ_PATH) and indexes every question
+    variant as a TF-IDF vector. An empty index is used if the file is missing or invalid.
+    """
+    global _faq
+    if _faq is not None:
+        return _faq
+    with _faq_lock:
+        if _faq is not None:
+            return _faq
+        try:
+            with open(FAQ_PATH, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            logging.warning(f"FAQ store {FAQ_PATH} unavailable, FAQ fast path disabled: {e}")
+            _faq = {"idf": {}, "variants": [], "vocab": {}}
+            return _faq
+
+        variants = [(entry, _faq_terms(q)) for entry in entries for q in entry["questions"]]
+        doc_freq = Counter(t for _, terms in variants for t in set(terms))
+        idf = {t: math.log((1 + len(variants)) / (1 + df)) + 1 for t, df in doc_freq.items()}
+        vocab = {}
+        for entry, terms in variants:
+            vocab.setdefault(entry["id"], set()).update(terms)
+        _faq = {
+            "idf": idf,
+            "variants": [(entry, _tfidf_vector(terms, idf)) for entry, terms in variants],
+            "vocab": vocab,  # entry id -> every term its question variants use
+        }
+        logging.info(f"Loaded {len(entries)} FAQ entries ({len(variants)} question variants).")
+    return _faq
+
+
+def match_faq(question):
+    """
+    Returns (entry, score) for the closest FAQ question, or (None, 0.0). Questions
+    with a negation, or with more than FAQ_MAX_UNMATCHED_TERMS content words the
+    closest entry's questions never use, match nothing: sharing most words with a
+    stored question does not make them the same question.
+    """
+    faq = load_faq()
+    if any(t in _NEGATIONS for t in _HYPHENATED.findall(question.lower().replace("’", "'"))):
+        return None, 0.0
+    terms = _faq_terms(question)
+    query = _tfidf_vector(terms, faq["idf"], oov_idf=max(faq["idf"].values(), default=0.0))
+    best, best_score = None, 0.0
+    for entry, vec in faq["variants"]:
+        score = sum(w * vec.get(t, 0.0) for t, w in query.items())
+        if score > best_score:
+            best, best_score = entry, score
+    if best is not None:
+        unmatched = {t for t in terms if t not in faq["vocab"][best["id"]]}
+        if len(unmatched) > FAQ_MAX_UNMATCHED_TERMS:
+            return None, 0.0
+    return best, best_score
+
+
+def classify_small_talk(question):
+    """
+    Returns the small-talk intent of `question` ("greeting", "wellbeing", "thanks",
+    "goodbye") or None if it needs a real answer.
+    """
+    text = question.lower().replace("’", "'")
+    clauses = [c.strip() for c in _CLAUSE_SPLIT.split(text) if c.strip()]
+    if not clauses or len(_tokens(text)) > INTENT_MAX_WORDS:
+        return None
+
+    # 1) Keyword rules: every clause must be small talk
+    matched = []
+    for clause in clauses:
+        clause = " ".join(_tokens(clause))
+        intent = next((name for name, rule in SMALL_TALK_RULES if rule.match(clause)), None)
+        if intent is None:
+            matched = None
+            break
+        matched.append(intent)
+    if matched:
+        return min(matched, key=INTENT_PRIORITY.index)
+
+    # 2) Classifier for variants the rules don't cover ("hiii", "thanks that helps"),
+    # but never for a message with a word outside the small-talk vocabulary
+    classifier = get_classifier()
+    if not classifier.covers(text):
+        return None
+    label, confidence = classifier.predict(text)
+    if label != "other" and confidence >= INTENT_MIN_CONFIDENCE:
+        return label
+    return None
+
+
+def route_intent(question, topic="your project", assistant="Dev", allow_faq=False):
+    """
+    Local fast path in front of the LLM. Returns a ready answer for small talk (and,
+    if `allow_faq`, for questions matching the precomputed StackWalls FAQ), or None
+    when the question has to go to Gemini.
+    """
+    if not INTENT_ROUTER_ENABLED:
+        return None
+
+    intent = classify_small_talk(question)
+    if intent:
+        logging.info(f"Intent router: answered '{intent}' from template.")
+        return SMALL_TALK_TEMPLATES[intent].format(topic=topic, assistant=assistant)
+
+    if allow_faq:
+        entry, score = match_faq(question)
+        if entry is not None and score >= FAQ_MIN_SCORE:
+            logging.info(f"Intent router: answered FAQ '{entry['id']}' (score {score:.2f}).")
+            return entry["answer"]
+    return None
@@ -1,33 +1,110 @@
-import PyPDF2
-import docx
 import csv
-import pandas as pd
-from bs4 import BeautifulSoup
 import logging
+import zipfile
 import google.generativeai as genai
 from config import SUMMARY_WORD_LIMIT
+from utils.deadline import llm_request_options
 
+# Extension -> handler. Parser libraries (PyPDF2, pandas, BeautifulSoup)
+# are imported inside each handler, so a worker only loads them the first time
+# that format is actually uploaded.
+FORMAT_HANDLERS = {}
+
+AUDIO_VIDEO_EXTENSIONS = {'mp3', 'mp4', 'wav', 'avi', 'mkv', 'flv', 'mov'}
+
+def register_format(*extensions):
+    def decorator(func):
+        for ext in extensions:
+            FORMAT_HANDLERS[ext] = func
+        return func
+    return decorator
+
+@register_format('pdf')
 def process_pdf_file(pdf_file_path):
     try:
+        import PyPDF2
         with open(pdf_file_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
-            text = ''
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
+            # Form feed between pages lets the normalizer spot repeated headers/footers
+            return '\f'.join(page.extract_text() for page in reader.pages)
     except Exception as e:
         logging.error(f"Error processing PDF file {pdf_file_path}: {e}")
         raise RuntimeError(f"Failed to process PDF file: {e}")
 
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def iter_docx_blocks(docx_path):
+    """
+    Streams word/document.xml out of the .docx zip and yields paragraphs and table
+    rows ("cell | cell | cell") in document order. Finished top-level elements are
+    dropped as we go, so memory stays flat however long the document is.
+    """
+    from xml.etree.ElementTree import iterparse
+
+    body = None
+    paragraphs = []   # stack of open paragraphs (text boxes nest them), each a list of text pieces
+    rows = []         # stack of open table rows, each a list of cell texts
+    cells = []        # stack of open table cells, each a list of paragraph texts
+
+    with zipfile.ZipFile(docx_path) as zf, zf.open('word/document.xml') as xml:
+        for event, elem in iterparse(xml, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == WORD_NS + 'p':
+                    paragraphs.append([])
+                elif tag == WORD_NS + 'tr':
+                    rows.append([])
+                elif tag == WORD_NS + 'tc':
+                    cells.append([])
+                elif tag == WORD_NS + 'body':
+                    body = elem
+                continue
+
+            if tag == WORD_NS + 't':
+                if paragraphs:
+                    paragraphs[-1].append(elem.text or '')
+            elif tag == WORD_NS + 'tab':
+                if paragraphs:
+                    paragraphs[-1].append('\t')
+            elif tag in (WORD_NS + 'br', WORD_NS + 'cr'):
+                if paragraphs:
+                    paragraphs[-1].append('\n')
+            elif tag == WORD_NS + 'p':
+                text = ''.join(paragraphs.pop())
+                if cells:
+                    cells[-1].append(text)
+                elif text.strip():
+                    yield text
+            elif tag == WORD_NS + 'tc':
+                rows[-1].append(' '.join(p.strip() for p in cells.pop() if p.strip()))
+            elif tag == WORD_NS + 'tr':
+                row = rows.pop()
+                if any(row):
+                    line = ' | '.join(row)
+                    if cells:
+                        cells[-1].append(line)  # nested table: keep it inside the outer cell
+                    else:
+                        yield line
+            elif tag != WORD_NS + 'tbl':
+                continue
+
+            # Drop content that has already been yielded
+            if cells:
+                continue
+            if tag == WORD_NS + 'tr':
+                elem.clear()
+            elif body is not None and not paragraphs and not rows:
+                body.clear()
+
+@register_format('docx')
 def process_doc_file(doc_file_path):
     try:
-        doc = docx.Document(doc_file_path)
-        text = "\n".join(para.text for para in doc.paragraphs)
-        return text
+        return "\n".join(iter_docx_blocks(doc_file_path))
     except Exception as e:
-        logging.error(f"Error processing DOC/DOCX file {doc_file_path}: {e}")
-        raise RuntimeError(f"Failed to process DOC/DOCX file: {e}")
+        logging.error(f"Error processing DOCX file {doc_file_path}: {e}")
+        raise RuntimeError(f"Failed to process DOCX file: {e}")
 
+@register_format('txt')
 def process_txt_file(txt_file_path):
     try:
         with open(txt_file_path, 'r', encoding='utf-8') as file:
@@ -37,6 +114,7 @@ def process_txt_file(txt_file_path):
         logging.error(f"Error processing TXT file {txt_file_path}: {e}")
         raise RuntimeError(f"Failed to process TXT file: {e}")
 
+@register_format('csv')
 def process_csv_file(csv_file_path):
     try:
         with open(csv_file_path, newline='', encoding='utf-8') as csvfile:
@@ -47,16 +125,20 @@ def process_csv_file(csv_file_path):
         logging.error(f"Error processing CSV file {csv_file_path}: {e}")
         raise RuntimeError(f"Failed to process CSV file: {e}")
 
+@register_format('xls', 'xlsx')
 def process_xls_xlsx_file(xls_xlsx_file_path):
     try:
+        import pandas as pd
         df = pd.read_excel(xls_xlsx_file_path)
         return df.to_string()
     except Exception as e:
         logging.error(f"Error processing XLS/XLSX file {xls_xlsx_file_path}: {e}")
         raise RuntimeError(f"Failed to process XLS/XLSX file: {e}")
 
+@register_format('html')
 def process_html_file(html_file_path):
     try:
+        from bs4 import BeautifulSoup
         with open(html_file_path, 'r', encoding='utf-8') as file:
             soup = BeautifulSoup(file, 'html.parser')
             return soup.get_text()
@@ -74,7 +156,7 @@ def summarize_content(content):
             f"Summarize the following content in approximately {SUMMARY_WORD_LIMIT} words:\n\n"
             f"{content[:10000]}"
         )
-        response = model.generate_content(prompt)
+        response = model.generate_content(prompt, request_options=llm_request_options())
         return response.text.strip()
     except Exception as e:
         logging.error(f"Error summarizing content: {e}")
@@ -82,19 +164,9 @@ def summarize_content(content):
 
 def process_file(file_path, file_extension):
     file_extension = file_extension.lower()
-    if file_extension == 'pdf':
-        return process_pdf_file(file_path)
-    elif file_extension in ['doc', 'docx']:
-        return process_doc_file(file_path)
-    elif file_extension == 'txt':
-        return process_txt_file(file_path)
-    elif file_extension == 'csv':
-        return process_csv_file(file_path)
-    elif file_extension in ['xls', 'xlsx']:
-        return process_xls_xlsx_file(file_path)
-    elif file_extension == 'html':
-        return process_html_file(file_path)
-    elif file_extension in ['mp3', 'mp4', 'wav', 'avi', 'mkv', 'flv', 'mov']:
+    handler = FORMAT_HANDLERS.get(file_extension)
+    if handler is not None:
+        return handler(file_path)
+    if file_extension in AUDIO_VIDEO_EXTENSIONS:
         raise ValueError("Audio/Video handling is done in youtube_service.py or similar.")
-    else:
-        raise ValueError(f"Unsupported file type: {file_extension}")
+    raise ValueError(f"Unsupported file type: {file_extension}")
@@ -0,0 +1,159 @@
+import time
+import hashlib
+import logging
+import datetime
+import threading
+import google.generativeai as genai
+from google.generativeai import client as genai_client
+from config import (
+    PROMPT_CACHE_ENABLED,
+    PROMPT_CACHE_MODEL,
+    PROMPT_CACHE_MIN_TOKENS,
+    PROMPT_CACHE_TTL_SECONDS,
+    PROMPT_CACHE_RETRY_SECONDS
+)
+from utils.deadline import check_deadline, llm_request_options
+
+# Recreate a handle this long before Gemini expires it, so in-flight requests never hit a dead cache
+REFRESH_MARGIN_SECONDS = 60
+# Rough size estimate used against PROMPT_CACHE_MIN_TOKENS (no count_tokens round trip)
+CHARS_PER_TOKEN = 4
+
+# Local prefix registry: prefix_registry[prefix_key] = {
+#     "digest": sha256 of the prefix text, "name": cached-content name (or None if uncacheable),
+#     "model": GenerativeModel bound to that cached content (or None),
+#     "expires_at": epoch seconds after which the entry must be recreated/retried
+# }
+prefix_registry = {}
+_registry_lock = threading.Lock()
+_creating = set()  # prefix keys whose cached content is being created right now
+_too_small = set()  # (prefix key, digest) already logged as below PROMPT_CACHE_MIN_TOKENS
+
+
+def _digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _create_cached_content(prefix_key, prefix_text):
+    # CachedContent.create takes no timeout, so go through the cache service client,
+    # which does; a create must not outlive the request that triggered it
+    model = PROMPT_CACHE_MODEL if PROMPT_CACHE_MODEL.startswith("models/") else f"models/{PROMPT_CACHE_MODEL}"
+    cached = genai_client.get_default_cache_client().create_cached_content(
+        cached_content=genai.protos.CachedContent(
+            model=model,
+            display_name=f"stackwalls-{prefix_key}",
+            contents=[genai.protos.Content(role="user", parts=[genai.protos.Part(text=prefix_text)])],
+            ttl=datetime.timedelta(seconds=PROMPT_CACHE_TTL_SECONDS),
+        ),
+        **llm_request_options()
+    )
+    logging.info(f"Created Gemini cached content {cached.name} for prefix '{prefix_key}'.")
+    return cached.name
+
+
+def _refresh(prefix_key, prefix_text, digest):
+    entry = None
+    try:
+        name = _create_cached_content(prefix_key, prefix_text)
+        # Built once per handle: from_cached_content looks the cached content up over the network
+        model = genai.GenerativeModel.from_cached_content(cached_content=name)
+        entry = {"digest": digest, "name": name, "model": model, "expires_at": time.time() + PROMPT_CACHE_TTL_SECONDS}
+    except Exception as e:
+        # Running out of time is this request's problem, not a reason to stop caching
+        check_deadline()
+        logging.warning(f"Context caching unavailable for prefix '{prefix_key}': {e}")
+        entry = {"digest": digest, "name": None, "model": None, "expires_at": time.time() + PROMPT_CACHE_RETRY_SECONDS}
+    finally:
+        with _registry_lock:
+            _creating.discard(prefix_key)
+            if entry is not None:
+                prefix_registry[prefix_key] = entry
+    return entry["model"]
+
+
+def cacheable(prefix_key, prefix_text):
+    """
+    False when caching is disabled or `prefix_text` is below the model's minimum
+    cacheable size (Gemini would reject the create); the latter is logged once per prefix.
+    """
+    if not PROMPT_CACHE_ENABLED:
+        return False
+    if len(prefix_text) >= PROMPT_CACHE_MIN_TOKENS * CHARS_PER_TOKEN:
+        return True
+    key = (prefix_key, _digest(prefix_text))
+    if key not in _too_small:
+        _too_small.add(key)
+        logging.info(
+            f"Prefix '{prefix_key}' (~{len(prefix_text) // CHARS_PER_TOKEN} tokens) is below "
+            f"PROMPT_CACHE_MIN_TOKENS ({PROMPT_CACHE_MIN_TOKENS}); sending it inline."
+        )
+    return False
+
+
+def _usable_model(entry, now):
+    return entry["model"] if entry is not None and entry["expires_at"] > now else None
+
+
+def get_cached_model(prefix_key, prefix_text):
+    """
+    Returns a GenerativeModel bound to a cached copy of `prefix_text`, creating or
+    refreshing the cache handle as needed. Returns None when caching is disabled or
+    unavailable (e.g. the prefix is below the model's minimum cacheable size); the
+    caller then sends the prefix inline.
+
+    The create runs outside the registry lock: other requests keep using the old
+    handle while it is still valid, or send their prefix inline, instead of waiting.
+    """
+    if not cacheable(prefix_key, prefix_text):
+        return None
+
+    digest = _digest(prefix_text)
+    now = time.time()
+    create = False
+    with _registry_lock:
+        entry = prefix_registry.get(prefix_key)
+        if entry is not None and entry["digest"] != digest:
+            entry = None
+        if entry is not None and entry["expires_at"] - REFRESH_MARGIN_SECONDS > now:
+            model = entry["model"]
+        elif prefix_key in _creating:
+            model = _usable_model(entry, now)
+        else:
+            _creating.add(prefix_key)
+            create = True
+
+    if create:
+        model = _refresh(prefix_key, prefix_text, digest)
+    return model
+
+
+def invalidate_prefix(prefix_key):
+    with _registry_lock:
+        prefix_registry.pop(prefix_key, None)
+
+
+def generate_with_prefix(prefix_key, prefix_text, suffix_text, model_name="gemini-pro"):
+    """
+    Sends `prefix_text + suffix_text` to Gemini, using the cached-content API for
+    the stable prefix when possible so only the per-request suffix is billed as input.
+    A cacheable prefix always goes to PROMPT_CACHE_MODEL, cached or inline, so the
+    answering model does not depend on the cache state; anything else goes inline
+    to `model_name`.
+    """
+    if not cacheable(prefix_key, prefix_text):
+        model = genai.GenerativeModel(model_name)
+        return model.generate_content(prefix_text + suffix_text, request_options=llm_request_options())
+
+    try:
+        model = get_cached_model(prefix_key, prefix_text)
+        if model is not None:
+            return model.generate_content(suffix_text, request_options=llm_request_options())
+    except Exception as e:
+        check_deadline()
+        # The handle may have been evicted or expired server-side; drop it so the
+        # next request creates a new one, and send this one inline
+        logging.warning(f"Cached generation failed for prefix '{prefix_key}', sending inline: {e}")
+        invalidate_prefix(prefix_key)
+
+    model = genai.GenerativeModel(PROMPT_CACHE_MODEL)
+    return model.generate_content(prefix_text + suffix_text, request_options=llm_request_options())
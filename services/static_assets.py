@@ -0,0 +1,21 @@
+import logging
+import threading
+from config import STACKWALLS_PATH
+
+_stackwalls_text = None
+_lock = threading.Lock()
+
+
+def get_stackwalls_text():
+    """
+    Contents of stackwalls.txt, read once per process. Warmed up before gunicorn
+    forks, so all workers share the one copy. Raises OSError if the file is missing.
+    """
+    global _stackwalls_text
+    if _stackwalls_text is None:
+        with _lock:
+            if _stackwalls_text is None:
+                with open(STACKWALLS_PATH, 'r', encoding='utf-8') as f:
+                    _stackwalls_text = f.read()
+                logging.info(f"Loaded {STACKWALLS_PATH} ({len(_stackwalls_text)} chars).")
+    return _stackwalls_text
@@ -0,0 +1,186 @@
+import re
+import logging
+from collections import Counter
+from config import BOILERPLATE_MIN_PAGES, DEDUPE_MIN_PARAGRAPH_CHARS
+
+# Extractors separate pages with a form feed (see process_pdf_file)
+PAGE_BREAK = "\f"
+
+_INLINE_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_PAGE_NUMBER = re.compile(r"^(page\s*)?[-–(]?\s*\d{1,4}\s*[-–)]?(\s*(of|/)\s*\d{1,4})?$", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+# Header/footer lines looked at on each edge of a document page
+PAGE_EDGE_LINES = 3
+
+
+def _line_key(line):
+    # Page headers/footers usually differ only in numbers ("Page 3 of 12", dates)
+    return _DIGITS.sub("#", line.lower())
+
+
+def _paragraph_key(paragraph):
+    # Numbers stay in: paragraphs differing only in amounts or dates are different content
+    return _WHITESPACE.sub(" ", paragraph.lower()).strip()
+
+
+def _clean_lines(page):
+    return [_INLINE_SPACE.sub(" ", line).strip() for line in page.splitlines()]
+
+
+def _boilerplate_keys(pages):
+    """
+    Lines that show up on most pages of a multi-page document are headers/footers.
+    Bare page numbers are left to _page_number_edges: as a digit-masked key every
+    numeric line ("#") looks alike, table cells included.
+    """
+    if len(pages) < BOILERPLATE_MIN_PAGES:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update({_line_key(line) for line in lines if line and not _PAGE_NUMBER.match(line)})
+    threshold = max(BOILERPLATE_MIN_PAGES, len(pages) // 2 + 1)
+    return {key for key, n in counts.items() if n >= threshold}
+
+
+def _edge_index(lines, boilerplate, from_end):
+    # First line inward from a page edge that is neither empty nor boilerplate
+    order = range(len(lines) - 1, -1, -1) if from_end else range(len(lines))
+    for i in order:
+        if lines[i] and _line_key(lines[i]) not in boilerplate:
+            return i
+    return None
+
+
+def _page_number_edges(pages, boilerplate):
+    """
+    [(top_index, bottom_index), ...] per page: the edge line holding the page
+    number, or None. A numeric edge line only counts as a page number when the
+    same edge of the other pages carries numbers going up by one per page, so a
+    table cell that happens to end a page is kept.
+    """
+    edges = [(None, None)] * len(pages)
+    if len(pages) < 2:
+        return edges
+    for side, from_end in ((0, False), (1, True)):
+        found = []
+        for p, lines in enumerate(pages):
+            i = _edge_index(lines, boilerplate, from_end)
+            if i is not None and _PAGE_NUMBER.match(lines[i]):
+                found.append((p, i, int(_DIGITS.search(lines[i]).group())))
+        if len(found) < 2:
+            continue
+        offsets = {number - p for p, _, number in found}
+        if len(offsets) != 1:
+            continue
+        for p, i, _ in found:
+            edge = list(edges[p])
+            edge[side] = i
+            edges[p] = tuple(edge)
+    return edges
+
+
+def _edge_lines(lines, boilerplate, page_numbers=(None, None), limit=PAGE_EDGE_LINES):
+    """
+    Indices of the header/footer lines of one page: boilerplate and page numbers
+    peeled off from the top and from the bottom until the first line of content,
+    at most `limit` lines per edge (None: no limit). Repeated lines in the middle
+    of a page (table rows, recurring labels) stay.
+    """
+    drop = set()
+    for order, number_at in ((range(len(lines)), page_numbers[0]),
+                             (range(len(lines) - 1, -1, -1), page_numbers[1])):
+        peeled = 0
+        for i in order:
+            if not lines[i]:
+                continue
+            if limit is not None and peeled >= limit:
+                break
+            if i != number_at and _line_key(lines[i]) not in boilerplate:
+                break
+            drop.add(i)
+            peeled += 1
+    return drop
+
+
+def strip_shared_lines(pages):
+    """
+    Removes lines repeated across most of `pages` (e.g. a website's navigation and
+    footer) from the top and bottom of each page, for callers that keep pages apart
+    instead of joining them with PAGE_BREAK.
+    """
+    cleaned = [_clean_lines(page) for page in pages]
+    boilerplate = _boilerplate_keys(cleaned)
+    if not boilerplate:
+        return list(pages)
+    stripped = []
+    for lines in cleaned:
+        # Navigation menus run longer than a document's running header
+        drop = _edge_lines(lines, boilerplate, limit=None)
+        stripped.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return stripped
+
+
+def normalize_text(text):
+    """
+    Shrinks extracted text before it goes into a prompt: collapses whitespace
+    (e.g. DataFrame.to_string padding), drops page numbers and header/footer lines
+    repeated across pages, and removes paragraphs repeated verbatim (ignoring case
+    and whitespace).
+    Returns (normalized_text, report).
+    """
+    report = {"original_chars": len(text), "boilerplate_lines": 0, "duplicate_paragraphs": 0}
+
+    pages = [_clean_lines(page) for page in text.split(PAGE_BREAK)]
+    boilerplate = _boilerplate_keys(pages)
+    page_numbers = _page_number_edges(pages, boilerplate)
+
+    paragraphs = []
+    current = []
+    for lines, numbers in zip(pages, page_numbers):
+        drop = _edge_lines(lines, boilerplate, numbers)
+        report["boilerplate_lines"] += len(drop)
+        for i, line in enumerate(lines):
+            if not line:
+                if current:
+                    paragraphs.append("\n".join(current))
+                    current = []
+                continue
+            if i in drop:
+                continue
+            current.append(line)
+        # A page break always ends the paragraph
+        if current:
+            paragraphs.append("\n".join(current))
+            current = []
+
+    seen = set()
+    kept = []
+    for paragraph in paragraphs:
+        if len(paragraph) >= DEDUPE_MIN_PARAGRAPH_CHARS:
+            key = _paragraph_key(paragraph)
+            if key in seen:
+                report["duplicate_paragraphs"] += 1
+                continue
+            seen.add(key)
+        kept.append(paragraph)
+
+    normalized = "\n\n".join(kept)
+    report["normalized_chars"] = len(normalized)
+    return normalized, report
+
+
+def normalize_reference(text, source=""):
+    """
+    normalize_text() for a single reference, logging how much it saved.
+    """
+    normalized, report = normalize_text(text)
+    original = report["original_chars"]
+    saved = original - report["normalized_chars"]
+    if original:
+        logging.info(
+            f"Normalized {source or 'reference'}: {original} -> {report['normalized_chars']} chars "
+            f"(-{saved * 100 // original}%, {report['boilerplate_lines']} boilerplate lines, "
+            f"{report['duplicate_paragraphs']} duplicate paragraphs)"
+        )
+    return normalized
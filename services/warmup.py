@@ -0,0 +1,95 @@
+import os
+import time
+import logging
+import threading
+from config import WARMUP_ASR
+
+# Warmup state per subsystem: {"status": "warm" | "cold" | "failed", "required": bool,
+# "seconds": load time, "error": message}. /readyz is 200 once every required one is warm.
+subsystems = {}
+_lock = threading.Lock()
+
+
+def _prepare_directories():
+    os.makedirs('uploads', exist_ok=True)
+    os.makedirs('reports', exist_ok=True)
+
+
+def _load_stackwalls():
+    from services.static_assets import get_stackwalls_text
+    get_stackwalls_text()
+
+
+def _load_intent_router():
+    from services.intent_router import get_classifier, load_faq
+    get_classifier()
+    load_faq()
+
+
+def _check_genai():
+    # Configured when config.py is imported; building a model needs no network call
+    import google.generativeai as genai
+    genai.GenerativeModel("gemini-pro")
+
+
+def _load_asr():
+    from services.asr_backends import get_asr_backend
+    get_asr_backend()
+
+
+# Read-only assets that are safe to load before fork (no threads, sockets or model runtimes)
+PRELOAD_STEPS = [
+    ("directories", _prepare_directories),
+    ("genai", _check_genai),
+    ("stackwalls", _load_stackwalls),
+    ("intent_router", _load_intent_router),
+]
+
+
+def _run_step(name, func, required=True):
+    start = time.perf_counter()
+    try:
+        func()
+        state = {"status": "warm", "error": None}
+    except Exception as e:
+        logging.error(f"Warmup of {name} failed: {e}")
+        state = {"status": "failed", "error": str(e)}
+    state.update(required=required, seconds=round(time.perf_counter() - start, 3))
+    with _lock:
+        subsystems[name] = state
+    if state["status"] == "warm":
+        logging.info(f"Warmed up {name} in {state['seconds']}s.")
+
+
+def warmup():
+    """
+    Loads the shared read-only assets. Runs from create_app(), i.e. once in the
+    gunicorn master when preload_app is on, so workers inherit them copy-on-write.
+    """
+    for name, func in PRELOAD_STEPS:
+        _run_step(name, func)
+    with _lock:
+        subsystems.setdefault("asr", {"status": "cold", "required": WARMUP_ASR, "seconds": None, "error": None})
+
+
+def start_worker_warmup():
+    """
+    Per-worker warmup after fork. PyTorch/CTranslate2 start thread pools that do not
+    survive fork(), so the ASR model is loaded here, in the background, when WARMUP_ASR is set.
+    """
+    if WARMUP_ASR:
+        threading.Thread(target=_run_step, args=("asr", _load_asr), name="asr-warmup", daemon=True).start()
+
+
+def readiness():
+    """
+    Returns (ready, subsystems) for /readyz.
+    """
+    from services.asr_backends import asr_backend_loaded
+    with _lock:
+        report = {name: dict(state) for name, state in subsystems.items()}
+    # The model may also have been loaded lazily by a request
+    if "asr" in report and report["asr"]["status"] == "cold" and asr_backend_loaded():
+        report["asr"]["status"] = "warm"
+    ready = bool(report) and all(s["status"] == "warm" for s in report.values() if s["required"])
+    return ready, report
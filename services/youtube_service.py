@@ -2,56 +2,90 @@ import os
 import re
 import logging
 import requests
-from pytube import YouTube
-import whisper
 import google.generativeai as genai
 from config import (
     CONVERSATION_HISTORY_LIMIT,
     SUMMARY_WORD_LIMIT,
-    MAX_TRANSCRIPT_LENGTH
+    MAX_TRANSCRIPT_LENGTH,
+    GENAI_TRANSPORT,
+    NORMALIZE_REFERENCES,
+    ASR_CHUNK_SECONDS
 )
-from services.pdf_service import process_file
-from bs4 import BeautifulSoup
-import wikipedia
-import wikipedia.exceptions
-
-# In-memory caches
-transcript_cache = {}
-file_contents_cache = {}
-website_contents_cache = {}
-wikipedia_contents_cache = {}
+from services.pdf_service import process_file, AUDIO_VIDEO_EXTENSIONS
+from services.text_normalizer import normalize_reference
+from services.asr_backends import get_asr_backend
+from services.archive_service import extract_archive_text, ARCHIVE_EXTENSIONS
+from services.corpus_store import get_corpus_store, file_key
+from services.crawler import crawl_site_text
+from utils.concurrency import run_blocking
+from utils.deadline import check_deadline, http_timeout, llm_request_options
+
+# Extracted reference text (transcripts, files, websites, Wikipedia) lives in the
+# shared corpus store (services/corpus_store.py); these stay per-process
 summary_cache = {}
 answer_cache = {}
 
 # Conversation history: user_history[username] = [ { "question": "...", "answer": "..." }, ... ]
 user_history = {}
 
-# Load Whisper model once
-whisper_model = whisper.load_model("base")
-
 # Re-configure generative AI in case it's needed again (optional—already configured in config.py)
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
+genai.configure(api_key=os.getenv("GOOGLE_API_KEY"), transport=GENAI_TRANSPORT)
 
 
 def download_audio(video_id):
     try:
+        from pytube import YouTube
         youtube_url = f"https://www.youtube.com/watch?v={video_id}"
         yt = YouTube(youtube_url)
         audio_stream = yt.streams.filter(only_audio=True).first()
         if not audio_stream:
             raise RuntimeError("No audio stream found for the video.")
-        audio_file = audio_stream.download(filename=f"{video_id}.mp4")
+        audio_file = audio_stream.download(filename=f"{video_id}.mp4", timeout=http_timeout())
         logging.info(f"Downloaded audio for video ID {video_id}")
         return audio_file
     except Exception as e:
         raise RuntimeError(f"Error downloading audio for video {video_id}: {e}")
 
+def transcribe_speech(audio_file_path):
+    """
+    Decodes the file once, trims silence/dead air with the VAD and transcribes only
+    the speech with the configured ASR backend. Segment timestamps are mapped back onto the original recording.
+    Speech is transcribed in chunks so a cancelled request stops between them.
+    """
+    from services.audio_service import decode_audio, trim_to_speech, to_original_time, speech_chunks, SAMPLE_RATE
+
+    audio = decode_audio(audio_file_path)
+    speech, time_map = trim_to_speech(audio)
+    result = {
+        "text": "",
+        "segments": [],
+        "total_seconds": len(audio) / SAMPLE_RATE,
+        "speech_seconds": len(speech) / SAMPLE_RATE,
+    }
+    if len(speech) == 0:
+        logging.info(f"No speech detected in {audio_file_path}; skipping transcription.")
+        return result
+
+    backend = get_asr_backend()
+    texts = []
+    for offset, chunk in speech_chunks(speech, time_map, ASR_CHUNK_SECONDS):
+        check_deadline()
+        asr_result = backend.transcribe(chunk)
+        texts.append(asr_result['text'].strip())
+        result["segments"].extend(
+            {
+                "start": to_original_time(offset + seg["start"], time_map),
+                "end": to_original_time(offset + seg["end"], time_map),
+                "text": seg["text"],
+            }
+            for seg in asr_result["segments"]
+        )
+    result["text"] = " ".join(t for t in texts if t)
+    return result
+
 def transcribe_audio(audio_file_path, delete_after=True):
     try:
-        result = whisper_model.transcribe(audio_file_path)
-        transcript = result['text']
-        return transcript
+        return transcribe_speech(audio_file_path)["text"]
     except Exception as e:
         raise RuntimeError(f"Transcription error: {e}")
     finally:
@@ -65,65 +99,76 @@ def fetch_transcript_from_external_service(video_id):
     """
     transcript_url = "http://localhost:5000/get_transcript"  # Example only
     try:
-        r = requests.post(transcript_url, json={"video_url": f"https://www.youtube.com/watch?v={video_id}"})
+        r = requests.post(transcript_url, json={"video_url": f"https://www.youtube.com/watch?v={video_id}"}, timeout=http_timeout())
         r.raise_for_status()
         return r.json().get("transcript")
     except Exception as e:
+        check_deadline()
         logging.warning(f"External transcript fetch failed: {e}")
         return None
 
 def get_transcript_text(video_id):
-    if video_id in transcript_cache:
-        return transcript_cache[video_id]
+    key = f"youtube:{video_id}"
+    cached = get_corpus_store().get(key)
+    if cached is not None:
+        return cached
     txt = fetch_transcript_from_external_service(video_id)
     if not txt:
         audio_file = download_audio(video_id)
-        txt = transcribe_audio(audio_file)
-    transcript_cache[video_id] = txt
-    return txt
+        txt = run_blocking(transcribe_audio, audio_file)
+    return get_corpus_store().put(key, txt)
 
 def fetch_video_metadata(video_id):
     try:
         url = f"https://www.youtube.com/oembed?url=http://www.youtube.com/watch?v={video_id}&format=json"
-        resp = requests.get(url)
+        resp = requests.get(url, timeout=http_timeout())
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
         raise RuntimeError(f"Failed to fetch video metadata: {e}")
 
 def get_file_content(file_name, file_extension, file_path):
-    if file_name in file_contents_cache:
-        return file_contents_cache[file_name]
-    if file_extension.lower() in ['mp3', 'mp4', 'wav', 'avi', 'mkv', 'flv', 'mov']:
-        txt = transcribe_audio(file_path, delete_after=False)
+    # Keyed by content hash, so a reused file name never serves another file's text
+    key = run_blocking(file_key, file_path, file_extension)
+    cached = get_corpus_store().get(key)
+    if cached is not None:
+        return cached
+    # All branches are CPU-bound; keep them off the event loop in async mode
+    if file_extension.lower() in AUDIO_VIDEO_EXTENSIONS:
+        txt = run_blocking(transcribe_audio, file_path, delete_after=False)
+    elif file_extension.lower() in ARCHIVE_EXTENSIONS:
+        txt = run_blocking(extract_archive_text, file_path)
     else:
-        txt = process_file(file_path, file_extension)
-    file_contents_cache[file_name] = txt
-    return txt
+        txt = run_blocking(process_file, file_path, file_extension)
+    if NORMALIZE_REFERENCES:
+        txt = normalize_reference(txt, source=file_name)
+    return get_corpus_store().put(key, txt)
 
 def get_website_content(url):
-    if url in website_contents_cache:
-        return website_contents_cache[url]
-    try:
-        r = requests.get(url)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, 'html.parser')
-        for script in soup(["script", "style"]):
-            script.extract()
-        text = soup.get_text(separator=' ', strip=True)
-        website_contents_cache[url] = text
-        return text
-    except Exception as e:
-        raise RuntimeError(f"Failed to fetch website content: {e}")
+    """
+    Text of `url` plus the same-site pages it links to, crawled concurrently
+    (services/crawler.py). Pages are cached in the corpus store for CRAWL_TTL_SECONDS.
+    """
+    text = crawl_site_text(url)
+    if NORMALIZE_REFERENCES:
+        text = normalize_reference(text, source=url)
+    return text
 
 def get_wikipedia_content(title):
-    if title in wikipedia_contents_cache:
-        return wikipedia_contents_cache[title]
+    key = f"wikipedia:{title}"
+    cached = get_corpus_store().get(key)
+    if cached is not None:
+        return cached
+    import wikipedia
+    import wikipedia.exceptions
     try:
+        # The wikipedia client has no timeout setting, so at least don't start past the deadline
+        check_deadline()
         page = wikipedia.page(title)
         c = page.content
-        wikipedia_contents_cache[title] = c
-        return c
+        if NORMALIZE_REFERENCES:
+            c = normalize_reference(c, source=f"wikipedia:{title}")
+        return get_corpus_store().put(key, c)
     except wikipedia.exceptions.DisambiguationError as e:
         raise RuntimeError(f"Disambiguation for '{title}': {e.options}")
     except wikipedia.exceptions.PageError:
@@ -144,7 +189,7 @@ def generate_summary(content_text, metadata):
             f"{content_text}\n\n"
             f"Highlight key points in a concise, well-structured manner."
         )
-        return model.generate_content(prompt).text.strip()
+        return model.generate_content(prompt, request_options=llm_request_options()).text.strip()
     except Exception as e:
         raise RuntimeError(f"Summarization error: {e}")
 
@@ -158,7 +203,7 @@ def merge_summaries(*summaries):
             f"{joined}\n\n"
             f"Final summary:"
         )
-        return model.generate_content(prompt).text.strip()
+        return model.generate_content(prompt, request_options=llm_request_options()).text.strip()
     except Exception as e:
         raise RuntimeError(f"merge_summaries error: {e}")
 
@@ -176,39 +221,11 @@ def merge_answers(*answers, question):
             f"{joined}\n\n"
             f"Combine them into a single, coherent, and thorough answer:"
         )
-        final = model.generate_content(prompt).text.strip()
+        final = model.generate_content(prompt, request_options=llm_request_options()).text.strip()
         return final or "No valid information to merge."
     except Exception as e:
         raise RuntimeError(f"merge_answers error: {e}")
 
-def answer_question(content_text, metadata, user_question, conversation_history=None):
-    conversation_history = conversation_history or []
-
-    try:
-        model = genai.GenerativeModel("gemini-pro")
-        if len(content_text) > MAX_TRANSCRIPT_LENGTH:
-            content_text = content_text[:MAX_TRANSCRIPT_LENGTH]
-
-        # Build conversation context from the last N entries
-        convo_str = ""
-        for entry in conversation_history[-CONVERSATION_HISTORY_LIMIT:]:
-            q = entry['question']
-            a = entry['answer']
-            convo_str += f"User: {q}\nDev: {a}\n"
-
-        prompt = (
-            f"You are Dev, a dedicated and professional assistant. Here is the recent conversation:\n\n"
-            f"{convo_str}\n\n"
-            f"Below is reference content that may be useful:\n{content_text}\n\n"
-            f"Now, the user asks:\n{user_question}\n\n"
-            f"Provide a comprehensive, thoughtful response, addressing all relevant details."
-        )
-
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        raise RuntimeError(f"answer_question error: {e}")
-
 def answer_general_question(user_question, conversation_history=None):
     conversation_history = conversation_history or []
 
@@ -228,24 +245,21 @@ def answer_general_question(user_question, conversation_history=None):
             f"Please provide a thorough, considerate response."
         )
 
-        response = model.generate_content(prompt)
+        response = model.generate_content(prompt, request_options=llm_request_options())
         return response.text.strip()
     except Exception as e:
+        check_deadline()
         logging.error(f"answer_general_question error: {e}")
         return "An error occurred while attempting to answer."
 
 def end_conversation():
     """
-    Clears all in-memory caches and conversation histories.
+    Clears the reference corpus (for every worker), in-memory caches and conversation histories.
     Useful if you want to start fresh or upon user logout.
     """
-    global transcript_cache, file_contents_cache, website_contents_cache
-    global wikipedia_contents_cache, summary_cache, answer_cache, user_history
+    global summary_cache, answer_cache, user_history
 
-    transcript_cache.clear()
-    file_contents_cache.clear()
-    website_contents_cache.clear()
-    wikipedia_contents_cache.clear()
+    get_corpus_store().clear()
     summary_cache.clear()
     answer_cache.clear()
     user_history.clear()
@@ -0,0 +1,33 @@
+import hmac
+from functools import wraps
+from flask import request, jsonify
+from config import ADMIN_TOKEN
+
+
+def is_admin_request():
+    """
+    True when the request carries ADMIN_TOKEN as `X-Admin-Token` or a bearer token.
+    Always False while ADMIN_TOKEN is unset.
+    """
+    if not ADMIN_TOKEN:
+        return False
+    token = request.headers.get('X-Admin-Token', '')
+    authorization = request.headers.get('Authorization', '')
+    if not token and authorization.startswith('Bearer '):
+        token = authorization[len('Bearer '):]
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def admin_required(f):
+    """
+    Restricts an endpoint to holders of ADMIN_TOKEN. Without a configured token the
+    endpoint does not exist (404), so it cannot be probed.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Not found."}), 404
+        if not is_admin_request():
+            return jsonify({"error": "Admin token required."}), 403
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,48 @@
+import sys
+import logging
+import functools
+import contextvars
+from config import CPU_EXECUTOR_WORKERS
+from utils.deadline import check_deadline, DISCONNECT_POLL_SECONDS
+
+
+def gevent_active():
+    """
+    True when running under gunicorn's gevent worker (i.e. SERVER_MODE=async),
+    which monkey-patches the standard library before the app is imported.
+    """
+    if "gevent" not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched("threading")
+
+
+def bind_context(func):
+    """
+    Wraps `func` to run in a copy of the caller's context (request deadline included)
+    when it is executed on another thread. Bind once per submitted call.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def run_blocking(func, *args, **kwargs):
+    """
+    Runs a CPU-heavy callable (file extraction, Whisper) without stalling the
+    event loop. Under gevent the call goes to the hub's pool of real OS threads
+    and only the calling greenlet waits; in sync mode it is simply called inline.
+    """
+    if not gevent_active():
+        return func(*args, **kwargs)
+
+    import gevent
+    pool = gevent.get_hub().threadpool
+    if pool.maxsize != CPU_EXECUTOR_WORKERS:
+        logging.info(f"Sizing gevent CPU thread pool to {CPU_EXECUTOR_WORKERS} threads.")
+        pool.maxsize = CPU_EXECUTOR_WORKERS
+    result = pool.spawn(bind_context(func), *args, **kwargs)
+    # Keep checking the deadline/client while the thread works; if the request is
+    # cancelled we stop waiting and the thread stops at its own next checkpoint
+    while not result.ready():
+        result.wait(DISCONNECT_POLL_SECONDS)
+        check_deadline()
+    return result.get()
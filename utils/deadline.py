@@ -0,0 +1,141 @@
+import time
+import select
+import socket
+import threading
+import contextvars
+from contextlib import contextmanager
+from config import HTTP_TIMEOUT_SECONDS, LLM_TIMEOUT_SECONDS
+
+# Checkpoints look at the client socket at most this often
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+class RequestCancelled(Exception):
+    """
+    Raised at a checkpoint once the request's remaining work should be abandoned.
+    """
+    status_code = 500
+
+
+class DeadlineExceeded(RequestCancelled):
+    status_code = 504
+
+    def __init__(self, message="Request deadline exceeded."):
+        super().__init__(message)
+
+
+class ClientDisconnected(RequestCancelled):
+    # nginx's convention for "client closed request"
+    status_code = 499
+
+    def __init__(self, message="Client closed the connection."):
+        super().__init__(message)
+
+
+def _peer_closed(sock):
+    # A readable socket with nothing to read means the client hung up
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b""
+    except ValueError:
+        # TLS sockets don't support MSG_PEEK; disconnects there only surface on write
+        return False
+    except OSError:
+        return True
+
+
+class Deadline:
+    """
+    Time budget and cancellation state of one request. Once tripped it stays
+    tripped, so every later checkpoint (in any thread) raises the same error.
+    """
+    def __init__(self, seconds, client_socket=None):
+        self.expires_at = time.monotonic() + seconds
+        self.client_socket = client_socket
+        self.cancelled = None  # DeadlineExceeded / ClientDisconnected once tripped
+        # Only the request's own thread/greenlet may touch the socket
+        self._owner = threading.get_ident()
+        self._last_poll = 0.0
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def _client_gone(self):
+        if self.client_socket is None or threading.get_ident() != self._owner:
+            return False
+        now = time.monotonic()
+        if now - self._last_poll < DISCONNECT_POLL_SECONDS:
+            return False
+        self._last_poll = now
+        return _peer_closed(self.client_socket)
+
+    def poll(self):
+        """
+        Updates and returns the cancellation state (an exception class or None).
+        """
+        if self.cancelled is None:
+            if time.monotonic() >= self.expires_at:
+                self.cancelled = DeadlineExceeded
+            elif self._client_gone():
+                self.cancelled = ClientDisconnected
+        return self.cancelled
+
+    def check(self):
+        cancelled = self.poll()
+        if cancelled is not None:
+            raise cancelled()
+
+
+_current = contextvars.ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(seconds, client_socket=None):
+    """
+    Makes a Deadline current for the enclosed code (and for work handed to
+    other threads via utils.concurrency.bind_context).
+    """
+    deadline = Deadline(seconds, client_socket)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline():
+    return _current.get()
+
+
+def check_deadline():
+    """
+    Checkpoint: raises DeadlineExceeded / ClientDisconnected if the current
+    request should stop. A no-op outside a request.
+    """
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def timeout_for(limit):
+    """
+    Timeout for a blocking call: `limit` (None = unlimited) cut down to what is
+    left of the request's budget. Checks the deadline first.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return limit
+    deadline.check()
+    remaining = deadline.remaining()
+    return remaining if limit is None else min(limit, remaining)
+
+
+def http_timeout():
+    return timeout_for(HTTP_TIMEOUT_SECONDS)
+
+
+def llm_request_options():
+    """
+    `request_options` for generate_content, so Gemini calls never outlive the request.
+    """
+    return {"timeout": timeout_for(LLM_TIMEOUT_SECONDS)}
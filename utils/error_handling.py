@@ -1,16 +1,47 @@
 import logging
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, request
+from config import REQUEST_TIMEOUT_SECONDS, MAX_REQUEST_TIMEOUT_SECONDS
+from utils.deadline import request_deadline, RequestCancelled
+from utils.scheduler import Overloaded
+
+def _request_budget():
+    # The frontend can send its own timeout so we never work past the point it gave up
+    try:
+        seconds = float(request.headers.get('X-Request-Timeout', REQUEST_TIMEOUT_SECONDS))
+    except ValueError:
+        seconds = REQUEST_TIMEOUT_SECONDS
+    return min(max(seconds, 1.0), MAX_REQUEST_TIMEOUT_SECONDS)
+
+def _client_socket():
+    return request.environ.get('gunicorn.socket') or request.environ.get('werkzeug.socket')
+
+def _cancelled_response(name, error):
+    logging.warning(f"{name} stopped early: {error}")
+    return jsonify({"error": str(error)}), error.status_code
 
 def handle_errors(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        try:
-            return f(*args, **kwargs)
-        except RuntimeError as e:
-            logging.error(f"RuntimeError in {f.__name__}: {str(e)}")
-            return jsonify({"error": str(e)}), 500
-        except Exception as e:
-            logging.exception(f"Exception in {f.__name__}: {str(e)}")
-            return jsonify({"error": "An unexpected error occurred."}), 500
+        with request_deadline(_request_budget(), _client_socket()) as deadline:
+            try:
+                return f(*args, **kwargs)
+            except RequestCancelled as e:
+                return _cancelled_response(f.__name__, e)
+            except Overloaded as e:
+                logging.warning(f"{f.__name__} rejected: {e}")
+                return jsonify({"error": str(e)}), e.status_code, {"Retry-After": str(e.retry_after)}
+            except RuntimeError as e:
+                # Services wrap errors in RuntimeError; a timeout caused by the deadline is still a 504
+                cancelled = deadline.poll()
+                if cancelled is not None:
+                    return _cancelled_response(f.__name__, cancelled())
+                logging.error(f"RuntimeError in {f.__name__}: {str(e)}")
+                return jsonify({"error": str(e)}), 500
+            except Exception as e:
+                cancelled = deadline.poll()
+                if cancelled is not None:
+                    return _cancelled_response(f.__name__, cancelled())
+                logging.exception(f"Exception in {f.__name__}: {str(e)}")
+                return jsonify({"error": "An unexpected error occurred."}), 500
     return decorated_function
@@ -0,0 +1,245 @@
+import os
+import sys
+import time
+import logging
+import threading
+import importlib
+from collections import Counter
+from flask import request, g
+from config import PROFILE_INTERVAL_MS, PROFILE_DIR, SLOW_REQUEST_SECONDS
+from utils.admin_auth import is_admin_request
+from utils.concurrency import gevent_active
+
+# Frames listed under "hottest" in a slow-request log line
+SLOW_LOG_TOP_FRAMES = 5
+
+_active_lock = threading.Lock()
+_active = None  # the running on-demand (whole-worker) profile, at most one per process
+
+
+def _native(module, name):
+    # The sampler must be a real OS thread that sleeps natively, or under gevent it
+    # would only get to run when the greenlet it is supposed to observe yields
+    if gevent_active():
+        from gevent import monkey
+        return monkey.get_original(module, name)
+    return getattr(importlib.import_module(module), name)
+
+
+def _short_path(path):
+    if "site-packages" in path:
+        return path.rsplit("site-packages" + os.sep, 1)[-1]
+    cwd = os.getcwd() + os.sep
+    return path[len(cwd):] if path.startswith(cwd) else path
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background OS thread snapshots the Python stacks of the
+    watched threads (every thread but its own by default) every `interval_ms`
+    through sys._current_frames(). Nothing is hooked into the profiled code, so the
+    overhead is one stack walk per thread per sample.
+
+    Under gevent all greenlets share one OS thread; samples show whichever greenlet
+    was running, which is the one holding the CPU when a worker is pegged.
+    """
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS, thread_ids=None, exclude=()):
+        self.interval = interval_ms / 1000.0
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.exclude = set(exclude)
+        self.stacks = Counter()  # tuple of (function, file, line), outermost first -> samples
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._names = {}  # code object -> frame key
+        self._running = False
+        self._done = None
+
+    def _frame_key(self, code):
+        key = self._names.get(code)
+        if key is None:
+            key = self._names[code] = (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+        return key
+
+    def _sample(self, own_ident):
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or ident in self.exclude:
+                continue
+            if self.thread_ids is not None and ident not in self.thread_ids:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_key(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+        self.samples += 1
+
+    def _run(self):
+        sleep = _native("time", "sleep")
+        own_ident = _native("_thread", "get_ident")()
+        try:
+            while self._running:
+                self._sample(own_ident)
+                sleep(self.interval)
+        except Exception as e:
+            logging.error(f"Profiler stopped: {e}")
+        finally:
+            self._done.release()
+
+    def start(self):
+        self._done = _native("_thread", "allocate_lock")()
+        self._done.acquire()
+        self._running = True
+        self.started_at = time.perf_counter()
+        _native("_thread", "start_new_thread")(self._run, ())
+        return self
+
+    def stop(self):
+        if self._running:
+            self._running = False
+            # Waits at most one interval for the sampler's last pass
+            self._done.acquire()
+            self._done.release()
+            self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def collapsed(self):
+        """
+        Brendan Gregg's collapsed-stack format ("outer;inner;leaf count" per line),
+        as read by flamegraph.pl, speedscope and most flame graph viewers.
+        """
+        lines = []
+        for stack, count in self.stacks.most_common():
+            names = ";".join(f"{name} ({path}:{line})" for name, path, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name="profile"):
+        """
+        The profile as a speedscope "sampled" profile (https://www.speedscope.app).
+        """
+        frames = []
+        index = {}
+        samples = []
+        weights = []
+        seconds_per_sample = self.duration / self.samples if self.samples else self.interval
+        for stack, count in self.stacks.most_common():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(count * seconds_per_sample)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "stackwalls-profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def hottest(self, limit=SLOW_LOG_TOP_FRAMES):
+        """
+        [(frame, share of samples), ...] for the leaf frames seen most often.
+        """
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            if stack:
+                leaves[stack[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [(f"{name} ({path}:{line})", count / total) for (name, path, line), count in leaves.most_common(limit)]
+
+
+def profile_worker(seconds, interval_ms=PROFILE_INTERVAL_MS):
+    """
+    Samples every thread of this worker for `seconds` (the calling thread excepted)
+    and returns the stopped profiler. Raises RuntimeError if a profile is already running.
+    """
+    global _active
+    with _active_lock:
+        if _active is not None:
+            raise RuntimeError("A profile is already running in this worker.")
+        # Under gevent this thread also runs every other request, so it stays in
+        exclude = () if gevent_active() else (threading.get_ident(),)
+        _active = SamplingProfiler(interval_ms, exclude=exclude).start()
+    try:
+        time.sleep(seconds)
+    finally:
+        with _active_lock:
+            profiler, _active = _active, None
+        profiler.stop()
+    return profiler
+
+
+def _save_profile(profiler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    endpoint = (request.endpoint or "unknown").replace(".", "_")
+    path = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}-{os.getpid()}-{endpoint}.collapsed")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    return path
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.request_profiler = None
+    # Opt-in per request, and only for admins: sampling costs a little CPU
+    if request.headers.get('X-Profile') == '1' and is_admin_request():
+        g.request_profiler = SamplingProfiler(thread_ids={_native("_thread", "get_ident")()}).start()
+
+
+def _finish_request(response):
+    started = g.pop("request_started", None)
+    profiler = g.pop("request_profiler", None)
+    if started is None:
+        return response
+    seconds = time.perf_counter() - started
+    if profiler is not None:
+        profiler.stop()
+    # Admin calls such as /api/admin/profile are slow on purpose
+    slow = SLOW_REQUEST_SECONDS > 0 and seconds >= SLOW_REQUEST_SECONDS and request.blueprint != 'admin_route'
+    if not slow and profiler is None:
+        return response
+
+    message = (
+        f"{'Slow' if slow else 'Profiled'} request: {request.method} {request.path} "
+        f"-> {response.status_code} in {seconds:.2f}s"
+    )
+    if profiler is not None:
+        try:
+            path = _save_profile(profiler)
+            hottest = ", ".join(f"{frame} {share:.0%}" for frame, share in profiler.hottest())
+            message += f"; profile {path} ({profiler.samples} samples), hottest: {hottest}"
+        except OSError as e:
+            message += f"; profile not saved: {e}"
+    logging.warning(message)
+    return response
+
+
+def _stop_request_profiler(error=None):
+    # after_request is skipped when a view raises; never leave a sampler thread behind
+    profiler = g.pop("request_profiler", None)
+    if profiler is not None:
+        profiler.stop()
+
+
+def init_profiling(app):
+    """
+    Logs requests slower than SLOW_REQUEST_SECONDS (0 disables the log), with a
+    profile attached when an admin sent `X-Profile: 1`. Profiled requests are
+    logged however fast they were.
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_stop_request_profiler)
@@ -0,0 +1,150 @@
+import math
+import time
+import threading
+from functools import wraps
+from flask import request
+from config import (
+    HEAVY_MAX_CONCURRENT,
+    HEAVY_MAX_QUEUE,
+    LIGHT_MAX_CONCURRENT,
+    LIGHT_MAX_QUEUE,
+    HEAVY_UPLOAD_BYTES,
+    USER_MAX_CONCURRENT,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
+from services.pdf_service import AUDIO_VIDEO_EXTENSIONS
+from services.archive_service import ARCHIVE_EXTENSIONS
+from utils.deadline import current_deadline
+from utils.traffic_capture import stage, note
+
+HEAVY_EXTENSIONS = AUDIO_VIDEO_EXTENSIONS | ARCHIVE_EXTENSIONS
+
+# Weight of the latest request in a lane's running average service time
+EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """
+    Raised when a request is refused admission; handle_errors turns it into a
+    429 (per-user cap) or 503 (lane full) response with a Retry-After header.
+    """
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class Lane:
+    """
+    A bounded pool of `max_concurrent` slots with at most `max_queue` requests
+    waiting for one. Requests beyond that are rejected instead of piling up on
+    the server's threads.
+    """
+    def __init__(self, name, max_concurrent, max_queue):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.avg_seconds = 1.0
+
+    def retry_after(self):
+        # Time for the queue ahead to drain, from the average service time
+        return max(1, math.ceil(self.avg_seconds * (self.waiting + 1) / self.max_concurrent))
+
+    def acquire(self):
+        with self.lock:
+            if self.running + self.waiting >= self.max_concurrent + self.max_queue:
+                raise Overloaded(f"Server busy ({self.name} queue full), please retry.", 503, self.retry_after())
+            self.waiting += 1
+
+        timeout = ADMISSION_QUEUE_TIMEOUT_SECONDS
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining())
+        acquired = self.slots.acquire(timeout=timeout)
+
+        with self.lock:
+            self.waiting -= 1
+            if acquired:
+                self.running += 1
+        if not acquired:
+            raise Overloaded(f"Server busy ({self.name} queue timed out), please retry.", 503, self.retry_after())
+
+    def release(self, seconds):
+        with self.lock:
+            self.running -= 1
+            self.avg_seconds += EWMA_ALPHA * (seconds - self.avg_seconds)
+        self.slots.release()
+
+
+LANES = {
+    "light": Lane("light", LIGHT_MAX_CONCURRENT, LIGHT_MAX_QUEUE),
+    "heavy": Lane("heavy", HEAVY_MAX_CONCURRENT, HEAVY_MAX_QUEUE),
+}
+
+# In-flight requests per user
+_user_inflight = {}
+_user_lock = threading.Lock()
+
+
+def classify_request():
+    """
+    "heavy" for requests that will transcribe or unpack something (audio/video or
+    archive uploads, or any large body), "light" for text-only chat.
+    """
+    if (request.content_length or 0) > HEAVY_UPLOAD_BYTES:
+        return "heavy"
+    for uf in request.files.values():
+        name = uf.filename or ''
+        if '.' in name and name.rsplit('.', 1)[1].lower() in HEAVY_EXTENSIONS:
+            return "heavy"
+    return "light"
+
+
+def _user_key():
+    username = request.form.get('username', 'anonymous_user')
+    if username != 'anonymous_user':
+        return username
+    # Anonymous users are told apart by address so they don't share one cap. The
+    # address is only the client's behind TRUSTED_PROXY_COUNT proxies (see main.py);
+    # users behind one NAT still share it, so the cap is only per person with real usernames
+    return request.remote_addr or username
+
+
+def scheduled(f):
+    """
+    Admission control for a chat endpoint: enforces the per-user cap and runs the
+    request in its lane. Goes under @handle_errors so that waiting counts
+    against the request deadline.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        lane = LANES[classify_request()]
+        user = _user_key()
+
+        with _user_lock:
+            if _user_inflight.get(user, 0) >= USER_MAX_CONCURRENT:
+                raise Overloaded(
+                    f"Too many concurrent requests; at most {USER_MAX_CONCURRENT} per user.",
+                    429, lane.retry_after()
+                )
+            _user_inflight[user] = _user_inflight.get(user, 0) + 1
+
+        try:
+            note("lane", lane.name)
+            with stage("admission"):
+                lane.acquire()
+            start = time.monotonic()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                lane.release(time.monotonic() - start)
+        finally:
+            with _user_lock:
+                _user_inflight[user] -= 1
+                if not _user_inflight[user]:
+                    del _user_inflight[user]
+    return decorated_function
@@ -0,0 +1,178 @@
+import os
+import hmac
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from flask import request
+from config import (
+    TRAFFIC_CAPTURE_ENABLED,
+    TRAFFIC_CAPTURE_PATH,
+    TRAFFIC_CAPTURE_SAMPLE_RATE,
+    TRAFFIC_CAPTURE_MAX_BYTES,
+    TRAFFIC_CAPTURE_SALT
+)
+
+# One JSON line per captured chat request; nothing in it can be turned back into user text:
+#   ts        - arrival time (epoch seconds)
+#   route     - URL rule; option/mode when the form sets them
+#   user      - hashed username (or client address for anonymous users)
+#   questions - [[hash, chars], ...] (several for the batch route)
+#   uploads   - [[extension, bytes], ...]; links - {"website": n, "wikipedia": n}
+#   refs      - [[kind, extracted chars], ...] for references that were actually read
+#   fast      - answered by the intent router; lane - admission lane
+#   status, ms, stages - response status, total and per-stage wall time in milliseconds
+CAPTURE_ROUTE_SUFFIX = "chat"
+HASH_CHARS = 16
+
+_current = contextvars.ContextVar("traffic_capture", default=None)
+_write_lock = threading.Lock()
+_full = False
+
+
+def anonymize(text):
+    """
+    Short keyed hash of `text`: equal inputs map to equal hashes, so repeats stay
+    visible, but the text itself is not recoverable without TRAFFIC_CAPTURE_SALT.
+    """
+    digest = hmac.new(TRAFFIC_CAPTURE_SALT.encode("utf-8"), text.encode("utf-8"), hashlib.sha256)
+    return digest.hexdigest()[:HASH_CHARS]
+
+
+def _upload_size(uf):
+    stream = uf.stream
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _questions(form):
+    if 'question' in form:
+        return [form['question']]
+    # The batch route also takes the questions as one JSON array
+    raw = form.getlist('questions')
+    if len(raw) == 1 and raw[0].strip().startswith('['):
+        try:
+            return [str(q) for q in json.loads(raw[0])]
+        except ValueError:
+            pass
+    return raw
+
+
+def _start_capture():
+    # Always (re)set: server threads are reused, and a request that died before
+    # after_request must not leave its record to the next one
+    _current.set(None)
+    rule = request.url_rule
+    if request.method != "POST" or rule is None or not rule.rule.endswith(CAPTURE_ROUTE_SUFFIX):
+        return
+    if random.random() >= TRAFFIC_CAPTURE_SAMPLE_RATE:
+        return
+    _current.set({"ts": round(time.time(), 3), "start": time.perf_counter(), "stages": {}, "refs": []})
+
+
+def _finish_capture(response):
+    record = _current.get()
+    if record is None:
+        return response
+    _current.set(None)
+    try:
+        form = request.form
+        user = form.get('username', 'anonymous_user')
+        if user == 'anonymous_user':
+            user = request.remote_addr or user
+        questions = _questions(form)
+
+        record.update(
+            route=request.url_rule.rule,
+            user=anonymize(user),
+            questions=[[anonymize(q.strip()), len(q.strip())] for q in questions],
+            uploads=[
+                [uf.filename.rsplit('.', 1)[-1].lower() if '.' in uf.filename else "", _upload_size(uf)]
+                for uf in request.files.values() if uf.filename
+            ],
+            links={
+                "website": sum(1 for k in form if k.startswith('website_link') and form[k]),
+                "wikipedia": sum(1 for k in form if k.startswith('wikipedia_title') and form[k]),
+            },
+            status=response.status_code,
+            ms=round((time.perf_counter() - record.pop("start")) * 1000, 1),
+        )
+        for field in ('option', 'mode'):
+            if form.get(field):
+                record[field] = form[field]
+        _write(record)
+    except Exception as e:
+        # Capture must never break the response it is describing
+        logging.warning(f"Traffic capture failed: {e}")
+    return response
+
+
+def _write(record):
+    global _full
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    with _write_lock:
+        if _full:
+            return
+        fd = os.open(TRAFFIC_CAPTURE_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size + len(line) > TRAFFIC_CAPTURE_MAX_BYTES:
+                _full = True
+                logging.warning(f"{TRAFFIC_CAPTURE_PATH} reached TRAFFIC_CAPTURE_MAX_BYTES; capture stopped.")
+                return
+            # One write per line with O_APPEND, so lines from several workers never interleave
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def init_capture(app):
+    """
+    Registers the capture hooks on `app` when TRAFFIC_CAPTURE_ENABLED is set.
+    Refuses to capture without TRAFFIC_CAPTURE_SALT.
+    """
+    if not TRAFFIC_CAPTURE_ENABLED:
+        return
+    if not TRAFFIC_CAPTURE_SALT:
+        logging.error("TRAFFIC_CAPTURE_ENABLED is set but TRAFFIC_CAPTURE_SALT is empty; traffic capture disabled.")
+        return
+    os.makedirs(os.path.dirname(TRAFFIC_CAPTURE_PATH) or ".", exist_ok=True)
+    app.before_request(_start_capture)
+    app.after_request(_finish_capture)
+    logging.info(f"Capturing {TRAFFIC_CAPTURE_SAMPLE_RATE:.0%} of chat requests to {TRAFFIC_CAPTURE_PATH}.")
+
+
+@contextmanager
+def stage(name):
+    """
+    Adds the enclosed block's wall time to stage `name` of the captured request.
+    A no-op when the request is not being captured.
+    """
+    record = _current.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        record["stages"][name] = round(record["stages"].get(name, 0.0) + elapsed, 1)
+
+
+def note(key, value):
+    record = _current.get()
+    if record is not None:
+        record[key] = value
+
+
+def note_reference(kind, chars):
+    record = _current.get()
+    if record is not None:
+        record["refs"].append([kind, chars])